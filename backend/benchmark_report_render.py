@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark operational report rendering: the single-canvas ReportLab path
+against page-parallel rendering with 1 and N worker processes.
+
+Rows are synthetic, so no database is needed.
+
+Usage:
+    python benchmark_report_render.py                       # 10k and 100k rows, 1 vs all cores
+    python benchmark_report_render.py --rows 50000 --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import routers.reports as reports
+from routers.reports import ReportRow, generate_pdf_report, render_reception_report_parallel
+
+COMPANIES = ["بترونيفرتيتي", "يونيكو", "نسكو شمال سيناء", "العسرية للبترول", "سيناء غاز"]
+WATER_TYPES = ["زيوت", "مياه ملوثة", "طافلة", "حمأة", "نفايات صناعية"]
+
+
+def make_rows(count: int) -> list:
+    random.seed(count)
+    start = datetime(2024, 1, 1, 6)
+    rows = []
+    for i in range(count):
+        day = start + timedelta(minutes=i * 5)
+        rows.append(ReportRow(
+            date=day,
+            company_name=random.choice(COMPANIES),
+            number_of_vehicles=random.randint(1, 6),
+            water_type=random.choice(WATER_TYPES),
+            total_quantity=round(random.uniform(5, 120), 1),
+            arrival_time=day,
+            departure_time=day + timedelta(hours=1),
+        ))
+    return rows
+
+
+def report_info_for(rows: list) -> dict:
+    return {
+        'type': 'monthly',
+        'start_date': rows[0].date,
+        'end_date': rows[-1].date,
+        'total_vehicles': sum(row.number_of_vehicles for row in rows),
+        'total_quantity': sum(row.total_quantity for row in rows),
+    }
+
+
+def timed(label: str, func, *args) -> float:
+    start = time.perf_counter()
+    pdf = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed:7.2f}s  {len(pdf) / 1024 / 1024:6.1f} MB")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--template", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "template.pdf"),
+                        help="Letterhead template (default: template.pdf next to this script)")
+    args = parser.parse_args()
+    reports.TEMPLATE_PATH = args.template
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as one, \
+            ProcessPoolExecutor(max_workers=args.workers, mp_context=context) as many:
+        # Start the workers before timing anything
+        warmup = make_rows(100)
+        for pool, workers in ((one, 1), (many, args.workers)):
+            render_reception_report_parallel(warmup, report_info_for(warmup), pool, workers)
+
+        for count in args.rows:
+            rows = make_rows(count)
+            info = report_info_for(rows)
+            print(f"{count:,} rows")
+            timed("ReportLab canvas + merge", generate_pdf_report, rows, info)
+            single = timed("page-parallel, 1 worker", render_reception_report_parallel, rows, info, one, 1)
+            parallel = timed(f"page-parallel, {args.workers} workers", render_reception_report_parallel, rows, info, many, args.workers)
+            print(f"  speedup {single / parallel:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
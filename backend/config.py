@@ -12,12 +12,40 @@ class Settings(BaseSettings):
     jwt_algorithm: str = "HS256"
     jwt_expire_minutes: int = 30
     
+    # Per-process caches of verified tokens and the users they authenticate
+    auth_token_cache_size: int = 1024
+    auth_user_cache_ttl_seconds: int = 30
+    
     # CORS - simple string that we'll split
     cors_origins_str: str = os.getenv("CORS_ORIGINS_STR", "http://localhost:3000,http://127.0.0.1:3000")
     
     # API
     api_v1_str: str = "/api/v1"
     
+    # Result cache for summary/financial endpoints
+    result_cache_size: int = 256
+    result_cache_ttl_seconds: int = 60
+    
+    # PDF report rendering pool
+    report_render_workers: int = 2
+    report_render_queue_depth: int = 4
+    report_render_processes: int = 0  # >1 renders large reports page-parallel across processes
+    report_parallel_min_rows: int = 5000
+    report_batch_processes: int = 4  # processes rendering /reports/batch companies in parallel (capped at CPU count)
+    
+    # On-disk cache of rendered PDF reports
+    report_cache_dir: str = "data/report_cache"
+    report_cache_max_mb: int = 256
+    
+    # Seconds between checks of the company_rates / exchange_rates versions by each process
+    rate_index_refresh_seconds: int = 5
+    
+    # Background report jobs
+    report_job_dir: str = "data/report_jobs"
+    report_job_ttl_seconds: int = 3600
+    report_job_workers: int = 1
+    report_job_max_pending: int = 20
+    
     # Environment
     environment: str = "development"
     
@@ -0,0 +1,211 @@
+# Company and waste type dimensions
+# Receptions keep the company and waste type text as entered, and also point
+# at a row in companies / waste_types. Each dimension row has aliases (its
+# Arabic name, English name and known spellings, stored normalised), so
+# English/Arabic variants of the same company resolve to one integer key that
+# filters and group-bys can use instead of scanning strings.
+
+from typing import Optional
+from sqlalchemy import select, update, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+import models
+from company_rates_config import ENGLISH_COMPANY_MAPPING
+
+# (Arabic name, English name, extra aliases) as offered by the reception form
+COMPANIES = [
+    ("بترونيفرتيتي", "Petronifertiti", ["Petroneverty"]),
+    ("يونيكو (MK)", "Unico (MK)", []),
+    ("يونيكو (قنطرة)", "Unico (Qantara)", []),
+    ("ابسكو", "Apsco", []),
+    ("عامر جروب (بورتوسعيد)", "Amer Group (Port Said)", []),
+    ("نسبكو (شمال سيناء للبترول)", "Nesbco (North Sinai Petroleum)", []),
+    ("شيلف ضرلينج", "Shelf Drilling", []),
+    ("أخرى", "Other", []),
+]
+
+WASTE_TYPES = [
+    ("نفايات خطرة", "Hazardous Waste", []),
+    ("نفايات غير خطرة", "Non-Hazardous Waste", []),
+    ("زيوت (OBM)", "Oils (OBM)", []),
+    ("طافلة (WBM)", "Water-Based Mud (WBM)", []),
+    ("مياه ملوثة", "Contaminated Water", []),
+    ("حمأة", "Sludge", []),
+    ("نفايات صناعية", "Industrial Waste", []),
+    ("مياه ملوثة بالزيت", "Oil-Contaminated Water", ["Oil Contaminated Water"]),
+    ("نفايات كيميائية", "Chemical Waste", []),
+    ("أخرى", "Other", []),
+]
+
+# (dimension model, alias model, alias foreign key, reception key column, reception text column)
+COMPANY_DIMENSION = (
+    models.Company, models.CompanyAlias, models.CompanyAlias.company_id,
+    models.VehicleReception.company_id, models.VehicleReception.company_name,
+)
+WASTE_TYPE_DIMENSION = (
+    models.WasteType, models.WasteTypeAlias, models.WasteTypeAlias.waste_type_id,
+    models.VehicleReception.waste_type_id, models.VehicleReception.water_type,
+)
+
+
+def normalize_name(name: str) -> str:
+    """Alias key for a name: whitespace collapsed, case folded"""
+    return " ".join(name.split()).casefold()
+
+
+def _insert_ignoring_conflicts(db: Session, model, values: dict) -> int:
+    """INSERT ... ON CONFLICT DO NOTHING in the caller's transaction; returns the number of rows inserted"""
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    return db.execute(dialect_insert(model.__table__).values(**values).on_conflict_do_nothing()).rowcount
+
+
+def _resolve(db: Session, dimension: tuple, name: Optional[str], name_en: Optional[str] = None,
+             aliases: tuple = ()) -> Optional[int]:
+    """Id of the dimension row a name (or any of its aliases) refers to, creating it if new"""
+    model, alias_model, alias_key = dimension[:3]
+    if not name or not name.strip():
+        return None
+
+    key = normalize_name(name)
+    dimension_id = db.execute(select(alias_key).where(alias_model.alias == key)).scalar()
+    if dimension_id is None:
+        # Concurrent writes may create the same new name: inserts ignore
+        # conflicts and the row that owns the alias wins
+        display_name = " ".join(name.split())
+        created = _insert_ignoring_conflicts(db, model, {"name": display_name, "name_en": name_en})
+        row_id = db.execute(select(model.id).where(model.name == display_name)).scalar()
+        _insert_ignoring_conflicts(db, alias_model, {alias_key.key: row_id, "alias": key})
+        dimension_id = db.execute(select(alias_key).where(alias_model.alias == key)).scalar()
+        if created and dimension_id != row_id:
+            # Another spelling of the name won the alias; drop the unused row
+            db.execute(delete(model).where(model.id == row_id))
+
+    # Register the name and any variants given with it
+    known = set(db.execute(select(alias_model.alias).where(alias_key == dimension_id)).scalars())
+    for alias in (name, name_en, *aliases):
+        if alias and normalize_name(alias) not in known:
+            known.add(normalize_name(alias))
+            _insert_ignoring_conflicts(db, alias_model, {alias_key.key: dimension_id, "alias": normalize_name(alias)})
+    return dimension_id
+
+
+def resolve_company(db: Session, name: Optional[str]) -> Optional[int]:
+    """Company id for a company name in Arabic or English, creating the company if new"""
+    return _resolve(db, COMPANY_DIMENSION, name)
+
+
+def resolve_waste_type(db: Session, name: Optional[str]) -> Optional[int]:
+    """Waste type id for a waste type name in Arabic or English, creating it if new"""
+    return _resolve(db, WASTE_TYPE_DIMENSION, name)
+
+
+def _find(db: Session, dimension: tuple, name: Optional[str]) -> Optional[int]:
+    """Id of the dimension row a name or alias refers to, or None if unknown"""
+    alias_model, alias_key = dimension[1:3]
+    if not name or not name.strip():
+        return None
+    return db.execute(select(alias_key).where(alias_model.alias == normalize_name(name))).scalar()
+
+
+def find_company(db: Session, name: Optional[str]) -> Optional[int]:
+    """Company id for a known company name in Arabic or English, without creating one"""
+    return _find(db, COMPANY_DIMENSION, name)
+
+
+def find_waste_type(db: Session, name: Optional[str]) -> Optional[int]:
+    """Waste type id for a known waste type name in Arabic or English, without creating one"""
+    return _find(db, WASTE_TYPE_DIMENSION, name)
+
+
+def assign_dimensions(db: Session, reception: models.VehicleReception) -> None:
+    """Point a new or edited reception at its company and waste type rows"""
+    reception.company_id = resolve_company(db, reception.company_name)
+    reception.waste_type_id = resolve_waste_type(db, reception.water_type)
+
+
+def company_ids_matching(text: str):
+    """Select of company ids with any name or alias containing text (case-insensitive)"""
+    return select(models.CompanyAlias.company_id).where(
+        models.CompanyAlias.alias.ilike(f"%{normalize_name(text)}%")
+    )
+
+
+def waste_type_ids_matching(text: str):
+    """Select of waste type ids with any name or alias containing text (case-insensitive)"""
+    return select(models.WasteTypeAlias.waste_type_id).where(
+        models.WasteTypeAlias.alias.ilike(f"%{normalize_name(text)}%")
+    )
+
+
+def _names_matching(db: Session, dimension: tuple, names: list, ids) -> list:
+    """The names among names that are aliases of a dimension row in ids"""
+    alias_model, alias_key = dimension[1:3]
+    aliases = set(db.execute(select(alias_model.alias).where(alias_key.in_(ids))).scalars())
+    return [name for name in names if normalize_name(name) in aliases]
+
+
+def company_names_matching(db: Session, names: list, text: str) -> list:
+    """The company names among names (as entered) whose company has any name or alias containing text"""
+    return _names_matching(db, COMPANY_DIMENSION, names, company_ids_matching(text))
+
+
+def waste_type_names_matching(db: Session, names: list, text: str) -> list:
+    """The waste type names among names (as entered) whose waste type has any name or alias containing text"""
+    return _names_matching(db, WASTE_TYPE_DIMENSION, names, waste_type_ids_matching(text))
+
+
+def seed_dimensions(db: Session) -> None:
+    """Create the known companies and waste types with their English names and aliases"""
+    english_aliases = {}
+    for english, arabic in ENGLISH_COMPANY_MAPPING.items():
+        english_aliases.setdefault(arabic, []).append(english)
+
+    for name, name_en, aliases in COMPANIES:
+        _resolve(db, COMPANY_DIMENSION, name, name_en, (*aliases, *english_aliases.get(name, [])))
+    for name, name_en, aliases in WASTE_TYPES:
+        _resolve(db, WASTE_TYPE_DIMENSION, name, name_en, tuple(aliases))
+
+    # Fill in English names for rows first created from a reception
+    for model, rows in ((models.Company, COMPANIES), (models.WasteType, WASTE_TYPES)):
+        for name, name_en, _ in rows:
+            db.execute(
+                update(model).where(model.name == name, model.name_en.is_(None)).values(name_en=name_en)
+            )
+
+
+def backfill_dimensions(db: Session) -> int:
+    """
+    Seed the dimensions and set company_id / waste_type_id on receptions missing them.
+
+    One UPDATE per distinct name, so the cost follows the number of distinct
+    companies and waste types rather than receptions.
+
+    Args:
+        db (Session): Database session (committed by this function)
+
+    Returns:
+        int: Number of reception keys set
+    """
+    updated = 0
+    try:
+        seed_dimensions(db)
+        for dimension in (COMPANY_DIMENSION, WASTE_TYPE_DIMENSION):
+            key_column, text_column = dimension[3], dimension[4]
+            names = db.execute(
+                select(text_column).where(key_column.is_(None)).distinct()
+            ).scalars().all()
+            for name in names:
+                dimension_id = _resolve(db, dimension, name)
+                result = db.execute(
+                    update(models.VehicleReception)
+                    .where(text_column == name, key_column.is_(None))
+                    .values({key_column.key: dimension_id})
+                    .execution_options(synchronize_session=False)
+                )
+                updated += result.rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return updated
@@ -0,0 +1,114 @@
+# USD/EGP exchange rates
+# exchange_rates holds one rate per day it changed; a rate applies until the
+# next day with a rate. Lookups go through an immutable in-memory index of the
+# table, refreshed like the company rate index (rates.py): each process checks
+# the table's version stamp at most every rate_index_refresh_seconds and swaps
+# in a rebuilt index when it changed.
+
+import threading
+import time
+from bisect import bisect_right
+from datetime import date
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+import models
+from config import settings
+
+CURRENCIES = ("USD", "EGP")
+
+
+class ExchangeRateIndex:
+    """Immutable lookup of the EGP per USD rate in effect on a day"""
+
+    __slots__ = ("version", "_days", "_rates")
+
+    def __init__(self, version: str, rows: list):
+        """
+        Args:
+            version (str): Version stamp of the table the rows were read from
+            rows (list): (day, egp_per_usd) rows
+        """
+        rows = sorted(rows)
+        self.version = version
+        self._days = tuple(day for day, _ in rows)
+        self._rates = tuple(rate for _, rate in rows)
+
+    def rate_on(self, day: date) -> Optional[tuple]:
+        """(day the rate was set, EGP per USD) in effect on day, or None if no rate was set by then"""
+        i = bisect_right(self._days, day) - 1
+        if i < 0:
+            return None
+        return self._days[i], self._rates[i]
+
+
+_index = None
+_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def exchange_rate_version(db: Session) -> str:
+    """Version stamp of exchange_rates; changes with every insert and edit"""
+    count, max_id, max_updated_at = db.query(
+        func.count(models.ExchangeRate.id),
+        func.max(models.ExchangeRate.id),
+        func.max(models.ExchangeRate.updated_at)
+    ).one()
+    return f"{count}:{max_id}:{max_updated_at}"
+
+
+def get_exchange_rate_index(db: Session) -> ExchangeRateIndex:
+    """Current exchange rate index for this process (see rates.get_rate_index)"""
+    global _index, _checked_at
+    index = _index
+    if index is not None and time.monotonic() - _checked_at < settings.rate_index_refresh_seconds:
+        return index
+
+    with _index_lock:
+        if _index is not None and time.monotonic() - _checked_at < settings.rate_index_refresh_seconds:
+            return _index
+        version = exchange_rate_version(db)
+        if _index is None or _index.version != version:
+            rows = db.query(models.ExchangeRate.day, models.ExchangeRate.egp_per_usd).all()
+            _index = ExchangeRateIndex(version, [tuple(row) for row in rows])
+        _checked_at = time.monotonic()
+        return _index
+
+
+def invalidate_exchange_rate_index() -> None:
+    """Make the next get_exchange_rate_index() re-check the table (after a committed change)"""
+    global _checked_at
+    _checked_at = 0.0
+
+
+def convert_total(currency_totals: list, to_currency: str, index: ExchangeRateIndex, day: date) -> dict:
+    """
+    Per-currency cost totals converted into one currency at the rate in effect on day.
+
+    Args:
+        currency_totals (list): Totals with currency and total_cost
+        to_currency (str): "USD" or "EGP"
+        index (ExchangeRateIndex): Exchange rates
+        day (date): Day whose rate converts the totals
+
+    Returns:
+        dict: currency, total_cost, egp_per_usd and exchange_rate_day
+
+    Raises:
+        ValueError: If no exchange rate was set on or before day
+    """
+    found = index.rate_on(day)
+    if found is None:
+        raise ValueError(f"No USD/EGP exchange rate set on or before {day.isoformat()}")
+    rate_day, egp_per_usd = found
+
+    # EGP per unit of each currency
+    in_egp = {"USD": egp_per_usd, "EGP": 1.0}
+    total_cost = sum(total['total_cost'] * in_egp[total['currency']] for total in currency_totals)
+
+    return {
+        'currency': to_currency,
+        'total_cost': total_cost / in_egp[to_currency],
+        'egp_per_usd': egp_per_usd,
+        'exchange_rate_day': rate_day
+    }
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN check for the router queries on vehicle_receptions and vehicles.
+
+Runs the query planner on statements built by the routers' own query
+builders and fails if any of them falls back to a full table scan. Run
+migrate_indexes.py first on existing databases.
+"""
+
+import sys
+from datetime import date, datetime
+from sqlalchemy import select, func, desc
+import models
+import schemas
+from database import engine
+from financials import volume_groups_statement
+from routers.vehicle_receptions import filter_receptions, apply_keyset
+from routers.reports import REPORT_ROW_COLUMNS, filter_report_receptions, filter_rollup_names
+
+VR = models.VehicleReception
+RU = models.DailyReceptionRollup
+START = datetime(2024, 1, 1)
+END = datetime(2024, 12, 31)
+COMPANY = "Apsco"
+WATER_TYPE = "Contaminated Water"
+# Rollup names the filters above resolve to (fixed, so the plan does not
+# depend on what the database holds)
+COMPANY_NAMES = ["ابسكو", "Apsco"]
+WATER_TYPE_NAMES = ["مياه ملوثة", "مياه ملوثة بالزيت"]
+RATE_CHANGES = (date(2024, 4, 1), date(2024, 9, 1))
+
+# Dimension lookup tables: a handful of rows each, matched by substring on
+# purpose, so a scan of them is expected
+LOOKUP_TABLES = ("companies", "company_aliases", "waste_types", "waste_type_aliases")
+
+# Tables whose full scans fail the check; plan lines for constant rows,
+# subqueries and co-routines are not table reads
+CHECKED_TABLES = set(models.Base.metadata.tables) - set(LOOKUP_TABLES)
+
+
+def router_queries():
+    """(description, statement) pairs built with the routers' own query builders"""
+    start_date, end_date = START.strftime("%Y-%m-%d"), END.strftime("%Y-%m-%d")
+    report_request = schemas.ReportRequest(
+        start_date=start_date, end_date=end_date, report_type="monthly",
+        company_filter=COMPANY, water_type_filter=WATER_TYPE
+    )
+    rollup_totals = (func.sum(RU.reception_count), func.sum(RU.vehicle_count), func.sum(RU.total_quantity))
+
+    return [
+        ("GET /vehicle-receptions (default sort)",
+         filter_receptions(select(VR), None, None, None, None).order_by(desc(VR.created_at)).limit(10)),
+        ("GET /vehicle-receptions (company/water type filters, date range, cursor by date)",
+         apply_keyset(
+             filter_receptions(select(VR), [COMPANY], WATER_TYPE, start_date, end_date), "date", "desc", None
+         ).limit(11)),
+        ("GET /reports/summary, GET /reports/series (daily rollup, company/water type filters)",
+         filter_rollup_names(
+             select(RU.company_name, RU.water_type, *rollup_totals), START, END, COMPANY_NAMES, WATER_TYPE_NAMES
+         ).group_by(RU.company_name, RU.water_type)),
+        ("POST /reports/generate, /reports/batch (company/water type filters)",
+         filter_report_receptions(select(*REPORT_ROW_COLUMNS), report_request, START, END).order_by(VR.date)),
+        ("GET /reports/financial/summary (company filter, rate periods)",
+         volume_groups_statement(START, END, COMPANY, RATE_CHANGES)),
+        ("GET /reports/financial/summary (all companies)",
+         volume_groups_statement(START, END)),
+        ("Vehicles batch load (selectinload)",
+         select(models.Vehicle).where(models.Vehicle.reception_id.in_([1, 2, 3]))),
+    ]
+
+
+def explain(connection, stmt) -> list:
+    """Return the plan lines for a statement on the current dialect"""
+    compiled = stmt.compile(dialect=connection.dialect, compile_kwargs={"render_postcompile": True})
+    params = compiled.construct_params()
+    if compiled.positional:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    if connection.dialect.name == "postgresql":
+        rows = connection.exec_driver_sql("EXPLAIN " + compiled.string, params).fetchall()
+        return [row[0] for row in rows]
+
+    rows = connection.exec_driver_sql("EXPLAIN QUERY PLAN " + compiled.string, params).fetchall()
+    return [row[-1] for row in rows]
+
+
+def scanned_table(line: str, dialect_name: str) -> str:
+    """Table a plan line reads with a full scan, or None"""
+    if dialect_name == "postgresql":
+        words = line.split("Seq Scan on ", 1)[1].split() if "Seq Scan on " in line else []
+    elif line.startswith("SCAN ") and "INDEX" not in line and "INTEGER PRIMARY KEY" not in line:
+        words = line.split()[1:]
+    else:
+        words = []
+    return words[0] if words else None
+
+
+def uses_index(plan: list, dialect_name: str) -> bool:
+    """True if no checked table is read with a full scan"""
+    return not any(scanned_table(line, dialect_name) in CHECKED_TABLES for line in plan)
+
+
+def main():
+    print(f"🔍 Checking query plans on {engine.dialect.name}")
+    print("=" * 60)
+
+    failures = 0
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Empty or tiny tables make sequential scans look cheaper; we only
+            # want to prove an index is usable for each query shape
+            connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+        for description, stmt in router_queries():
+            plan = explain(connection, stmt)
+            ok = uses_index(plan, connection.dialect.name)
+            failures += 0 if ok else 1
+            print(f"\n{'✅' if ok else '❌'} {description}")
+            for line in plan:
+                print(f"    {line}")
+
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"⚠️ {failures} queries do not use an index. Did you run migrate_indexes.py?")
+        return 1
+    print("🎉 All router queries use an index.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,380 @@
+# Financial aggregation
+# Financial reports price each (company, waste type) with the rate in effect
+# on each reception's day. Volumes come from one GROUP BY over
+# vehicle_receptions keyed by company_id, waste_type_id and rate period (the
+# stretches between days on which any rate changes), so every group has a
+# single rate and the Python side follows the number of groups rather than
+# receptions. Costs are totalled per currency; USD and EGP are never added.
+#
+# Closed months are frozen into financial_ledger (one row per company, waste
+# type, currency and rate), so a report reads closed months from the ledger
+# and only aggregates receptions in the open part of its period. Receptions
+# and rates of a closed month can no longer change.
+
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+from sqlalchemy import case, func, literal, select
+from sqlalchemy.orm import Session
+import models
+from dimensions import company_ids_matching
+from rates import RateIndex, get_rate_index
+from exchange_rates import convert_total, get_exchange_rate_index
+
+# Volume of active receptions for one company, waste type and rate period
+# (day is the first day of the period inside the report range)
+VolumeGroup = namedtuple("VolumeGroup", ["company_id", "waste_type_id", "day", "reception_count", "volume"])
+
+
+def rate_period_column(changes: tuple):
+    """SQL expression numbering the rate period of a reception's date (0 before the first change)"""
+    if not changes:
+        return literal(0)
+    return case(
+        *[(models.VehicleReception.date < datetime.combine(day, time.min), period)
+          for period, day in enumerate(changes)],
+        else_=len(changes)
+    )
+
+
+def volume_groups_statement(start_dt: datetime, end_dt: datetime, company_filter: Optional[str] = None,
+                            changes: tuple = ()):
+    """
+    Grouped select of (company_id, waste_type_id, period, count, volume) for
+    volume_groups (also planned by explain_indexes.py).
+
+    Args:
+        start_dt (datetime): Period start
+        end_dt (datetime): Period end (exclusive)
+        company_filter (str): Company name filter (any name or alias)
+        changes (tuple): Days on which rates change within the period (RateIndex.changes_between)
+
+    Returns:
+        Select grouped by company, waste type and rate period
+    """
+    rows = select(
+        models.VehicleReception.company_id,
+        models.VehicleReception.waste_type_id,
+        rate_period_column(changes).label("period"),
+        models.VehicleReception.total_quantity
+    ).where(
+        models.VehicleReception.is_active == True,
+        models.VehicleReception.date >= start_dt,
+        models.VehicleReception.date < end_dt
+    )
+    if company_filter:
+        rows = rows.where(models.VehicleReception.company_id.in_(company_ids_matching(company_filter)))
+
+    # Group in an outer query so PostgreSQL sees the period expression once
+    rows = rows.subquery()
+    return select(
+        rows.c.company_id,
+        rows.c.waste_type_id,
+        rows.c.period,
+        func.count(),
+        func.coalesce(func.sum(rows.c.total_quantity), 0.0)
+    ).group_by(rows.c.company_id, rows.c.waste_type_id, rows.c.period)
+
+
+def volume_groups(db: Session, start_dt: datetime, end_dt: datetime, company_filter: Optional[str] = None,
+                  changes: tuple = ()) -> list:
+    """
+    Receptions' volume per company, waste type and rate period in one grouped query.
+
+    Args:
+        db (Session): Database session
+        start_dt (datetime): Period start
+        end_dt (datetime): Period end (exclusive)
+        company_filter (str): Company name filter (any name or alias)
+        changes (tuple): Days on which rates change within the period (RateIndex.changes_between)
+
+    Returns:
+        list: VolumeGroup rows
+    """
+    grouped = db.execute(
+        volume_groups_statement(start_dt, end_dt, company_filter, changes)
+    ).all()
+
+    period_starts = (start_dt.date(), *changes)
+    return [
+        VolumeGroup(company_id, waste_type_id, period_starts[period], reception_count, float(volume))
+        for company_id, waste_type_id, period, reception_count, volume in grouped
+    ]
+
+
+def dimension_names(db: Session, model, ids: set) -> dict:
+    """{id: (name, name_en)} of the given company or waste type ids"""
+    ids = {dimension_id for dimension_id in ids if dimension_id is not None}
+    if not ids:
+        return {}
+    return {
+        dimension_id: (name, name_en)
+        for dimension_id, name, name_en in db.query(model.id, model.name, model.name_en).filter(model.id.in_(ids))
+    }
+
+
+def add_priced_groups(volumes: dict, groups: list, index: RateIndex) -> dict:
+    """
+    Add volume groups, priced with the rate index, to volumes.
+
+    Args:
+        volumes (dict): (company_id, waste_type_id, currency, rate) -> [reception_count, volume]
+        groups (list): VolumeGroup rows
+        index (RateIndex): Rates to price with
+
+    Returns:
+        dict: volumes
+    """
+    for group in groups:
+        quote = index.quote(group.company_id, group.waste_type_id, group.day)
+        totals = volumes.setdefault((group.company_id, group.waste_type_id, quote.currency, quote.rate), [0, 0.0])
+        totals[0] += group.reception_count
+        totals[1] += group.volume
+    return volumes
+
+
+def cost_lines(db: Session, volumes: dict) -> list:
+    """
+    Cost lines, one per company, waste type, currency and rate.
+
+    A rate change inside the period gives a company and waste type one line
+    per rate.
+
+    Args:
+        db (Session): Database session, for company and waste type names
+        volumes (dict): (company_id, waste_type_id, currency, rate) -> [reception_count, volume]
+
+    Returns:
+        list: Line dicts, most expensive first
+    """
+    companies = dimension_names(db, models.Company, {key[0] for key in volumes})
+    waste_types = dimension_names(db, models.WasteType, {key[1] for key in volumes})
+
+    lines = []
+    for (company_id, waste_type_id, currency, rate), (reception_count, volume) in volumes.items():
+        company_name, company_name_en = companies.get(company_id, ("-", None))
+        waste_type, waste_type_en = waste_types.get(waste_type_id, ("-", None))
+        lines.append({
+            'company_name': company_name,
+            'company_name_en': company_name_en,
+            'waste_type': waste_type,
+            'waste_type_en': waste_type_en,
+            'total_volume_m3': volume,
+            'rate_per_m3': rate,
+            'currency': currency,
+            'total_cost': volume * rate,
+            'reception_count': reception_count
+        })
+
+    lines.sort(key=lambda line: line['total_cost'], reverse=True)
+    return lines
+
+
+def currency_totals(lines: list) -> list:
+    """Volume, cost and receptions per currency, in currency order"""
+    totals = {}
+    for line in lines:
+        total = totals.setdefault(line['currency'], {
+            'currency': line['currency'],
+            'total_volume_m3': 0.0,
+            'total_cost': 0.0,
+            'reception_count': 0
+        })
+        total['total_volume_m3'] += line['total_volume_m3']
+        total['total_cost'] += line['total_cost']
+        total['reception_count'] += line['reception_count']
+    return [totals[currency] for currency in sorted(totals)]
+
+
+def month_start(day: date) -> date:
+    """First day of the month containing day"""
+    return day.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    """First day of the month after month"""
+    return date(month.year + 1, 1, 1) if month.month == 12 else date(month.year, month.month + 1, 1)
+
+
+def closed_months(db: Session) -> list:
+    """First days of the closed months, in order"""
+    return [
+        month for month, in db.query(models.ClosedFinancialPeriod.month).order_by(models.ClosedFinancialPeriod.month)
+    ]
+
+
+def closed_month_among(db: Session, days: list) -> Optional[date]:
+    """The first closed month containing any of days, or None if all are open"""
+    months = sorted({month_start(day.date() if isinstance(day, datetime) else day) for day in days if day is not None})
+    if not months:
+        return None
+    return db.query(models.ClosedFinancialPeriod.month).filter(
+        models.ClosedFinancialPeriod.month.in_(months)
+    ).order_by(models.ClosedFinancialPeriod.month).scalar()
+
+
+def add_ledger_volumes(db: Session, volumes: dict, months: list, company_filter: Optional[str] = None) -> dict:
+    """Add the ledger rows of closed months to volumes (see add_priced_groups)"""
+    query = db.query(
+        models.FinancialLedgerEntry.company_id,
+        models.FinancialLedgerEntry.waste_type_id,
+        models.FinancialLedgerEntry.currency,
+        models.FinancialLedgerEntry.rate,
+        func.sum(models.FinancialLedgerEntry.reception_count),
+        func.sum(models.FinancialLedgerEntry.total_volume_m3)
+    ).filter(models.FinancialLedgerEntry.month.in_(months))
+    if company_filter:
+        query = query.filter(models.FinancialLedgerEntry.company_id.in_(company_ids_matching(company_filter)))
+
+    for company_id, waste_type_id, currency, rate, reception_count, volume in query.group_by(
+        models.FinancialLedgerEntry.company_id,
+        models.FinancialLedgerEntry.waste_type_id,
+        models.FinancialLedgerEntry.currency,
+        models.FinancialLedgerEntry.rate
+    ):
+        totals = volumes.setdefault((company_id, waste_type_id, currency, rate), [0, 0.0])
+        totals[0] += reception_count
+        totals[1] += volume
+    return volumes
+
+
+def split_period(start_dt: datetime, end_dt: datetime, months: list) -> tuple:
+    """
+    Split a report period into the closed months it fully covers and the open ranges around them.
+
+    Args:
+        start_dt (datetime): Period start
+        end_dt (datetime): Period end (exclusive)
+        months (list): Closed months, in order
+
+    Returns:
+        tuple: (covered closed months, [(start, end), ...] ranges to aggregate live)
+    """
+    covered = [
+        month for month in months
+        if datetime.combine(month, time.min) >= start_dt and datetime.combine(next_month(month), time.min) <= end_dt
+    ]
+
+    ranges = []
+    range_start = start_dt
+    for month in covered:
+        month_dt = datetime.combine(month, time.min)
+        if month_dt > range_start:
+            ranges.append((range_start, month_dt))
+        range_start = datetime.combine(next_month(month), time.min)
+    if range_start < end_dt:
+        ranges.append((range_start, end_dt))
+    return covered, ranges
+
+
+def financial_volumes(db: Session, start_dt: datetime, end_dt: datetime, company_filter: Optional[str],
+                      index: RateIndex) -> dict:
+    """
+    Volume of a period per company, waste type and the currency and rate it was priced at.
+
+    The period runs from start_dt through the whole day of end_dt. Closed
+    months the period fully covers come from the ledger; only the rest of
+    the period is aggregated from receptions (priced with index).
+
+    Returns:
+        dict: (company_id, waste_type_id, currency, rate) -> [reception_count, volume]
+    """
+    period_end = datetime.combine(end_dt.date() + timedelta(days=1), time.min)
+    covered, ranges = split_period(start_dt, period_end, closed_months(db))
+
+    volumes = {}
+    if covered:
+        add_ledger_volumes(db, volumes, covered, company_filter)
+    for range_start, range_end in ranges:
+        groups = volume_groups(
+            db, range_start, range_end, company_filter,
+            index.changes_between(range_start.date(), range_end.date())
+        )
+        add_priced_groups(volumes, groups, index)
+    return volumes
+
+
+def load_financials(db: Session, start_dt: datetime, end_dt: datetime, company_filter: Optional[str] = None,
+                    convert_to: Optional[str] = None) -> dict:
+    """
+    Priced cost lines and per-currency totals for a period (see financial_volumes).
+
+    Args:
+        db (Session): Database session
+        start_dt (datetime): Period start
+        end_dt (datetime): Last day of the period (counted whole)
+        company_filter (str): Company name filter (any name or alias)
+        convert_to (str): Also total every currency in "USD" or "EGP", at
+            the exchange rate in effect on the period's last day
+
+    Returns:
+        dict: companies (cost lines), currency_totals, total_volume_m3,
+            total_cost (None when lines are in more than one currency),
+            converted_total (see exchange_rates.convert_total; None unless
+            convert_to is given) and rate_version (the rate table version
+            the lines were priced with)
+
+    Raises:
+        ValueError: If convert_to is given and no exchange rate was set by the period's last day
+    """
+    index = get_rate_index(db)
+    lines = cost_lines(db, financial_volumes(db, start_dt, end_dt, company_filter, index))
+    totals = currency_totals(lines)
+
+    converted_total = None
+    if convert_to:
+        converted_total = convert_total(totals, convert_to, get_exchange_rate_index(db), end_dt.date())
+
+    return {
+        'companies': lines,
+        'currency_totals': totals,
+        'total_volume_m3': sum(total['total_volume_m3'] for total in totals),
+        'total_cost': totals[0]['total_cost'] if len(totals) == 1 else (0.0 if not totals else None),
+        'converted_total': converted_total,
+        'rate_version': index.version
+    }
+
+
+def close_period(db: Session, month: date, closed_by: Optional[int] = None) -> models.ClosedFinancialPeriod:
+    """
+    Close a month: freeze its volumes, rates and costs into the ledger.
+
+    Args:
+        db (Session): Database session (the caller commits)
+        month (date): Any day of the month to close
+        closed_by (int): User closing the month
+
+    Returns:
+        ClosedFinancialPeriod: The closed period
+
+    Raises:
+        ValueError: If the month has not ended yet or is already closed
+    """
+    month = month_start(month)
+    month_end = next_month(month)
+    if month_end > date.today():
+        raise ValueError("Only months that have ended can be closed")
+    if db.query(models.ClosedFinancialPeriod.id).filter(models.ClosedFinancialPeriod.month == month).first():
+        raise ValueError(f"{month:%Y-%m} is already closed")
+
+    period = models.ClosedFinancialPeriod(month=month, closed_by=closed_by)
+    db.add(period)
+    db.flush()
+
+    index = get_rate_index(db)
+    start_dt, end_dt = datetime.combine(month, time.min), datetime.combine(month_end, time.min)
+    groups = volume_groups(db, start_dt, end_dt, changes=index.changes_between(month, month_end))
+    for (company_id, waste_type_id, currency, rate), (reception_count, volume) in add_priced_groups({}, groups, index).items():
+        db.add(models.FinancialLedgerEntry(
+            period_id=period.id,
+            month=month,
+            company_id=company_id,
+            waste_type_id=waste_type_id,
+            currency=currency,
+            rate=rate,
+            reception_count=reception_count,
+            total_volume_m3=volume,
+            total_cost=volume * rate
+        ))
+    db.flush()
+    return period
@@ -8,11 +8,16 @@ import models
 from database import engine, get_db
 from config import settings
 from routers import vehicle_receptions, auth, reports
+from search_index import ensure_search_index
 import os
 
 # Create database tables
 models.Base.metadata.create_all(bind=engine)
 
+# Create the full-text search index (FTS5 / tsvector tables are not models);
+# without it reception writes skip the index and search returns 503
+ensure_search_index(engine)
+
 # Create FastAPI app
 app = FastAPI(
     title="Petrotreatment Operation Manager API",
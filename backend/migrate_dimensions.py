@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Database migration script for the company and waste type dimension tables.
+
+Creates companies / waste_types and their alias tables, adds the company_id
+and waste_type_id columns to vehicle_receptions, seeds the known names and
+backfills the keys of existing receptions. Safe to run repeatedly on both
+SQLite and PostgreSQL; run migrate_indexes.py afterwards for the key indexes.
+"""
+
+import sys
+from sqlalchemy import inspect, text
+import models
+from database import engine, SessionLocal
+from dimensions import backfill_dimensions
+
+# vehicle_receptions column -> referenced table
+DIMENSION_COLUMNS = {
+    "company_id": "companies",
+    "waste_type_id": "waste_types",
+}
+
+
+def migrate_dimensions():
+    """Create the dimension tables and columns, then backfill reception keys"""
+    is_postgresql = engine.dialect.name == "postgresql"
+    print(f"📊 Database type: {'PostgreSQL' if is_postgresql else 'SQLite'}")
+
+    try:
+        # New databases get every table and column from the models
+        models.Base.metadata.create_all(bind=engine)
+
+        with engine.begin() as connection:
+            existing = {column["name"] for column in inspect(connection).get_columns("vehicle_receptions")}
+
+            for column, table in DIMENSION_COLUMNS.items():
+                if column in existing:
+                    print(f"ℹ️  vehicle_receptions.{column} already exists")
+                    continue
+
+                print(f"➕ Adding vehicle_receptions.{column}...")
+                connection.execute(text(
+                    f"ALTER TABLE vehicle_receptions ADD COLUMN {column} INTEGER REFERENCES {table}(id)"
+                ))
+                print(f"✅ Added vehicle_receptions.{column}")
+
+        print("🔄 Backfilling company and waste type keys...")
+        db = SessionLocal()
+        try:
+            updated = backfill_dimensions(db)
+        finally:
+            db.close()
+        print(f"✅ Set {updated} reception keys")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error migrating dimensions: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    print("🚀 Starting dimension migration...")
+    success = migrate_dimensions()
+
+    if success:
+        print("🎉 Dimension migration completed successfully!")
+        sys.exit(0)
+    else:
+        print("💥 Dimension migration failed!")
+        sys.exit(1)
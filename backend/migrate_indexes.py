@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Database migration script to add the performance indexes for vehicle_receptions
+and vehicles to existing databases.
+
+The indexes are declared in models.py; this script creates whichever of them
+are missing, so it is safe to run repeatedly on both SQLite and PostgreSQL.
+"""
+
+import sys
+from sqlalchemy import inspect, text
+import models
+from database import engine
+
+MANAGED_TABLES = [models.VehicleReception.__table__, models.Vehicle.__table__]
+
+
+def migrate_indexes():
+    """Create any missing indexes declared on the managed tables"""
+    is_postgresql = engine.dialect.name == "postgresql"
+    print(f"📊 Database type: {'PostgreSQL' if is_postgresql else 'SQLite'}")
+
+    try:
+        with engine.begin() as connection:
+            inspector = inspect(connection)
+
+            for table in MANAGED_TABLES:
+                if not inspector.has_table(table.name):
+                    print(f"⚠️  Table {table.name} does not exist yet, skipping (create_all will add its indexes)")
+                    continue
+
+                existing = {index["name"] for index in inspector.get_indexes(table.name)}
+
+                for index in sorted(table.indexes, key=lambda i: i.name):
+                    if index.name in existing:
+                        print(f"ℹ️  {index.name} already exists")
+                        continue
+
+                    print(f"➕ Creating {index.name} on {table.name}...")
+                    index.create(bind=connection, checkfirst=True)
+                    print(f"✅ Created {index.name}")
+
+            # Refresh planner statistics so the new indexes are picked up
+            print("🔄 Updating planner statistics...")
+            for table in MANAGED_TABLES:
+                if inspector.has_table(table.name):
+                    connection.execute(text(f"ANALYZE {table.name}"))
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error creating indexes: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    print("🚀 Starting index migration...")
+    success = migrate_indexes()
+
+    if success:
+        print("🎉 Index migration completed successfully!")
+        sys.exit(0)
+    else:
+        print("💥 Index migration failed!")
+        sys.exit(1)
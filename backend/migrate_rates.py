@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Database migration script for the company_rates table.
+
+Creates the table and, if it has no rates yet, seeds it from
+company_rates_config.COMPANY_RATES. Run after migrate_dimensions.py, since
+rates refer to companies and waste types. Safe to run repeatedly.
+"""
+
+import sys
+import models
+from database import engine, SessionLocal
+from rates import seed_rates
+
+
+def migrate_rates():
+    """Create company_rates and seed it from the rates config"""
+    try:
+        models.Base.metadata.create_all(bind=engine, tables=[models.CompanyRate.__table__])
+
+        db = SessionLocal()
+        try:
+            created = seed_rates(db)
+        finally:
+            db.close()
+
+        if created:
+            print(f"✅ Seeded {created} company rates from company_rates_config.py")
+        else:
+            print("ℹ️  Company rates already present, skipping seed")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error migrating company rates: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    print("🚀 Starting company rates migration...")
+    success = migrate_rates()
+
+    if success:
+        print("🎉 Company rates migration completed successfully!")
+        sys.exit(0)
+    else:
+        print("💥 Company rates migration failed!")
+        sys.exit(1)
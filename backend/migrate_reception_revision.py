@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Database migration script for vehicle_receptions.revision.
+
+Adds the per-row revision counter that report data stamps (and so the
+cached report PDFs) use to notice edits. Safe to run repeatedly on both
+SQLite and PostgreSQL.
+"""
+
+import sys
+from sqlalchemy import inspect, text
+import models
+from database import engine
+
+
+def migrate_reception_revision():
+    """Add vehicle_receptions.revision if missing"""
+    is_postgresql = engine.dialect.name == "postgresql"
+    print(f"📊 Database type: {'PostgreSQL' if is_postgresql else 'SQLite'}")
+
+    try:
+        # New databases get every table and column from the models
+        models.Base.metadata.create_all(bind=engine)
+
+        with engine.begin() as connection:
+            existing = {column["name"] for column in inspect(connection).get_columns("vehicle_receptions")}
+            if "revision" in existing:
+                print("ℹ️  vehicle_receptions.revision already exists")
+                return True
+
+            print("➕ Adding vehicle_receptions.revision...")
+            connection.execute(text(
+                "ALTER TABLE vehicle_receptions ADD COLUMN revision INTEGER NOT NULL DEFAULT 0"
+            ))
+            print("✅ Added vehicle_receptions.revision")
+
+        return True
+
+    except Exception as e:
+        print(f"❌ Error migrating reception revision: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    print("🚀 Starting reception revision migration...")
+    success = migrate_reception_revision()
+
+    if success:
+        print("🎉 Reception revision migration completed successfully!")
+        sys.exit(0)
+    else:
+        print("💥 Reception revision migration failed!")
+        sys.exit(1)
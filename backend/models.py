@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, Boolean, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, Boolean, ForeignKey, Date, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, literal_column
 from database import Base
 
 
@@ -21,6 +21,11 @@ class VehicleReception(Base):
     water_type = Column(String(50), nullable=False)  # waste type
     total_quantity = Column(Float, nullable=False)  # in cubic meters
     
+    # Normalised company / waste type keys (see dimensions.py); the text
+    # columns above keep the names as entered
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=True)
+    waste_type_id = Column(Integer, ForeignKey("waste_types.id"), nullable=True)
+    
     # Reception summary - calculated from vehicles
     number_of_vehicles = Column(Integer, nullable=False)  # Total count for backward compatibility
     
@@ -38,6 +43,11 @@ class VehicleReception(Base):
     is_active = Column(Boolean, default=True)
     created_by = Column(Integer, nullable=True)  # Foreign key to user who created this record
     
+    # Bumped by every UPDATE, so report data stamps see edits made within
+    # the same second (updated_at has second resolution on SQLite)
+    revision = Column(Integer, nullable=False, default=0, server_default="0",
+                      onupdate=literal_column("revision + 1"))
+    
     # Relationship to vehicles
     vehicles = relationship("Vehicle", back_populates="reception", cascade="all, delete-orphan")
 
@@ -72,6 +82,164 @@ class Vehicle(Base):
     reception = relationship("VehicleReception", back_populates="vehicles")
 
 
+class Company(Base):
+    """Company dimension: one row per company, whatever name variant receptions use"""
+    __tablename__ = "companies"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), nullable=False, unique=True)  # Arabic name as offered by the form
+    name_en = Column(String(100), nullable=True)
+    
+    # Metadata
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class CompanyAlias(Base):
+    """Normalised name variants (Arabic, English, old spellings) that resolve to a company"""
+    __tablename__ = "company_aliases"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False, index=True)
+    alias = Column(String(100), nullable=False, unique=True)
+
+
+class WasteType(Base):
+    """Waste type dimension"""
+    __tablename__ = "waste_types"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(50), nullable=False, unique=True)  # Arabic name as offered by the form
+    name_en = Column(String(100), nullable=True)
+    
+    # Metadata
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class WasteTypeAlias(Base):
+    """Normalised name variants that resolve to a waste type"""
+    __tablename__ = "waste_type_aliases"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    waste_type_id = Column(Integer, ForeignKey("waste_types.id"), nullable=False, index=True)
+    alias = Column(String(100), nullable=False, unique=True)
+
+
+class CompanyRate(Base):
+    """Price per m³ for a company (optionally one waste type) over an effective date range"""
+    __tablename__ = "company_rates"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
+    waste_type_id = Column(Integer, ForeignKey("waste_types.id"), nullable=True)  # None = any waste type
+    currency = Column(String(3), nullable=False)  # USD, EGP
+    rate = Column(Float, nullable=False)
+    
+    # Inclusive date range; effective_to is None while the rate is current
+    effective_from = Column(Date, nullable=False)
+    effective_to = Column(Date, nullable=True)
+    
+    # Metadata
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_by = Column(Integer, nullable=True)
+
+
+class ExchangeRate(Base):
+    """USD/EGP exchange rate from a day on, until the next day with a rate"""
+    __tablename__ = "exchange_rates"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, unique=True)
+    egp_per_usd = Column(Float, nullable=False)
+    
+    # Metadata
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_by = Column(Integer, nullable=True)
+
+
+class ClosedFinancialPeriod(Base):
+    """A closed month: its receptions and rates are frozen and its costs live in financial_ledger"""
+    __tablename__ = "closed_financial_periods"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    month = Column(Date, nullable=False, unique=True)  # First day of the month
+    
+    # Metadata
+    closed_at = Column(DateTime, server_default=func.now())
+    closed_by = Column(Integer, nullable=True)
+
+
+class FinancialLedgerEntry(Base):
+    """Frozen volume and cost of a closed month for one company, waste type, currency and rate"""
+    __tablename__ = "financial_ledger"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    period_id = Column(Integer, ForeignKey("closed_financial_periods.id"), nullable=False)
+    month = Column(Date, nullable=False, index=True)
+    
+    # Ledger key
+    company_id = Column(Integer, ForeignKey("companies.id"), nullable=True)
+    waste_type_id = Column(Integer, ForeignKey("waste_types.id"), nullable=True)
+    currency = Column(String(3), nullable=False)
+    rate = Column(Float, nullable=False)
+    
+    # Totals for the key
+    reception_count = Column(Integer, nullable=False)
+    total_volume_m3 = Column(Float, nullable=False)
+    total_cost = Column(Float, nullable=False)
+
+
+class DailyReceptionRollup(Base):
+    """Per-day totals of active receptions by company and waste type, maintained with every reception write"""
+    __tablename__ = "daily_reception_rollups"
+    __table_args__ = (
+        UniqueConstraint("day", "company_name", "water_type", name="uq_daily_reception_rollups_key"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Rollup key
+    day = Column(Date, nullable=False)
+    company_name = Column(String(100), nullable=False)
+    water_type = Column(String(50), nullable=False)
+    
+    # Totals for the key
+    reception_count = Column(Integer, nullable=False, default=0)
+    vehicle_count = Column(Integer, nullable=False, default=0)
+    total_quantity = Column(Float, nullable=False, default=0.0)
+    cutting_boxes_amount = Column(Float, nullable=False, default=0.0)
+    
+    # Metadata
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+# Indexes for the hot list/stats/report filters. Existing databases get them
+# through migrate_indexes.py; create_all() only adds them to new tables.
+Index("idx_vehicle_receptions_active_date",
+      VehicleReception.is_active, VehicleReception.date, VehicleReception.id)
+Index("idx_vehicle_receptions_active_created_at",
+      VehicleReception.is_active, VehicleReception.created_at, VehicleReception.id)
+Index("idx_vehicle_receptions_company_date",
+      VehicleReception.company_name, VehicleReception.date,
+      postgresql_where=VehicleReception.is_active == True,
+      sqlite_where=VehicleReception.is_active == True)
+Index("idx_vehicle_receptions_water_type_date",
+      VehicleReception.water_type, VehicleReception.date,
+      postgresql_where=VehicleReception.is_active == True,
+      sqlite_where=VehicleReception.is_active == True)
+Index("idx_vehicle_receptions_company_id_date",
+      VehicleReception.company_id, VehicleReception.date,
+      postgresql_where=VehicleReception.is_active == True,
+      sqlite_where=VehicleReception.is_active == True)
+Index("idx_vehicle_receptions_waste_type_id_date",
+      VehicleReception.waste_type_id, VehicleReception.date,
+      postgresql_where=VehicleReception.is_active == True,
+      sqlite_where=VehicleReception.is_active == True)
+Index("idx_vehicles_reception_id", Vehicle.reception_id)
+Index("idx_company_rates_key",
+      CompanyRate.company_id, CompanyRate.waste_type_id, CompanyRate.effective_from)
+
+
 class PetrotreatmentVehicle(Base):
     """Model for Petrotreatment company vehicles"""
     __tablename__ = "petrotreatment_vehicles"
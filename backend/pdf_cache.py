@@ -0,0 +1,131 @@
+# On-disk cache of rendered PDF reports
+# Files are named by a content key (hash of the normalised report request and
+# a stamp of the data it covers), so any change to the data yields a new key
+# and stale files simply age out. The directory is capped in size and evicts
+# least recently used files; file mtimes carry the LRU order across restarts.
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+from config import settings
+
+
+def pdf_cache_key(kind: str, params: dict, stamp: str) -> str:
+    """
+    Content key for a rendered report.
+
+    Args:
+        kind (str): Report kind, e.g. "report" or "financial"
+        params (dict): Normalised report request parameters
+        stamp (str): Version stamp of the data the report covers
+
+    Returns:
+        str: Hex digest used as the file name and ETag
+    """
+    payload = json.dumps({"kind": kind, "params": params, "stamp": stamp}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class PdfCache:
+    """Size-capped LRU cache of PDF files keyed by content key"""
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._entries = None  # key -> size, oldest first; loaded lazily from disk
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pdf")
+
+    def _load(self) -> None:
+        # Rebuild the index from files left by earlier runs, oldest first
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        if not os.path.isdir(self.cache_dir):
+            return
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pdf"):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, name))
+            files.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached PDF for key, or None on a miss"""
+        with self._lock:
+            if self._entries is None:
+                self._load()
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    content = f.read()
+                os.utime(path)
+            except OSError:
+                # File removed behind our back
+                self._total_bytes -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return content
+
+    def set(self, key: str, content: bytes) -> None:
+        """Store a rendered PDF, evicting least recently used files over the size cap"""
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            if self._entries is None:
+                self._load()
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+            self._total_bytes -= self._entries.pop(key, 0)
+            self._entries[key] = len(content)
+            self._total_bytes += len(content)
+
+            while self._total_bytes > self.max_bytes:
+                old_key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                self.evictions += 1
+                try:
+                    os.remove(self._path(old_key))
+                except OSError:
+                    pass
+
+    def stats(self) -> dict:
+        """Hit/miss counters and disk usage, for tuning"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "files": len(self._entries or {}),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+pdf_cache = PdfCache(
+    cache_dir=settings.report_cache_dir,
+    max_bytes=settings.report_cache_max_mb * 1024 * 1024
+)
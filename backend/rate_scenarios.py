@@ -0,0 +1,134 @@
+# What-if pricing
+# Prices one period's volumes under several candidate rate tables at once.
+# The volumes are pulled once (financial_volumes: one grouped query plus the
+# ledger of closed months), then every scenario is evaluated together: a
+# groups x scenarios rate matrix, weighted by each group's volume and summed
+# into lines and totals with matrix products, so dozens of scenarios cost
+# about as much as one.
+
+from datetime import datetime
+from typing import Optional
+import numpy as np
+from sqlalchemy.orm import Session
+import models
+from dimensions import find_company, find_waste_type
+from financials import financial_volumes, dimension_names
+from rates import get_rate_index
+
+# Name of the scenario priced with the rates actually in effect
+CURRENT_RATES = "Current rates"
+
+
+def scenario_rate_table(db: Session, rates: list) -> dict:
+    """
+    Resolve a scenario's rates to rate index keys.
+
+    Args:
+        db (Session): Database session
+        rates (list): Rates with company_name, waste_type (None = all of the
+            company's waste types), currency and rate
+
+    Returns:
+        dict: (company_id, waste_type_id) -> (currency, rate)
+
+    Raises:
+        ValueError: If a company or waste type is unknown
+    """
+    table = {}
+    for entry in rates:
+        company_id = find_company(db, entry.company_name)
+        if company_id is None:
+            raise ValueError(f"Unknown company: {entry.company_name}")
+        waste_type_id = None
+        if entry.waste_type:
+            waste_type_id = find_waste_type(db, entry.waste_type)
+            if waste_type_id is None:
+                raise ValueError(f"Unknown waste type: {entry.waste_type}")
+        table[(company_id, waste_type_id)] = (entry.currency, entry.rate)
+    return table
+
+
+def simulate_rates(db: Session, start_dt: datetime, end_dt: datetime, company_filter: Optional[str],
+                   scenarios: list) -> dict:
+    """
+    Cost of a period under the current rates and each scenario.
+
+    A scenario's rate for a waste type wins over its company-wide rate;
+    companies and waste types a scenario leaves out keep the rates they
+    were actually priced at.
+
+    Args:
+        db (Session): Database session
+        start_dt (datetime): Period start
+        end_dt (datetime): Last day of the period (counted whole)
+        company_filter (str): Company name filter (any name or alias)
+        scenarios (list): (name, rate table from scenario_rate_table) pairs
+
+    Returns:
+        dict: scenarios (names, current rates first), lines (per company and
+            waste type: volume, receptions and {currency: cost} per scenario)
+            and totals ({currency: cost} per scenario)
+    """
+    volumes = financial_volumes(db, start_dt, end_dt, company_filter, get_rate_index(db))
+    names = [CURRENT_RATES, *(name for name, _ in scenarios)]
+    keys = list(volumes)
+
+    # One row per priced group, one column per scenario
+    rates = np.empty((len(keys), len(names)))
+    currencies = np.empty((len(keys), len(names)), dtype=object)
+    for row, (company_id, waste_type_id, currency, rate) in enumerate(keys):
+        rates[row, 0], currencies[row, 0] = rate, currency
+        for column, (_, table) in enumerate(scenarios, start=1):
+            currencies[row, column], rates[row, column] = (
+                table.get((company_id, waste_type_id)) or table.get((company_id, None)) or (currency, rate)
+            )
+
+    volume = np.array([volumes[key][1] for key in keys], dtype=float)
+    reception_counts = np.array([volumes[key][0] for key in keys], dtype=int)
+
+    # lines x groups indicator, to sum the groups of a company and waste type
+    line_keys = list(dict.fromkeys((company_id, waste_type_id) for company_id, waste_type_id, _, _ in keys))
+    line_of = {key: line for line, key in enumerate(line_keys)}
+    membership = np.zeros((len(line_keys), len(keys)))
+    for row, (company_id, waste_type_id, _, _) in enumerate(keys):
+        membership[line_of[(company_id, waste_type_id)], row] = 1.0
+
+    # Per currency: lines x scenarios costs, and which lines have any cost in it
+    line_costs = {}
+    line_priced = {}
+    for currency in sorted(set(currencies.flat)):
+        in_currency = currencies == currency
+        line_costs[currency] = membership @ (volume[:, None] * np.where(in_currency, rates, 0.0))
+        line_priced[currency] = membership @ in_currency.astype(float) > 0
+
+    companies = dimension_names(db, models.Company, {company_id for company_id, _ in line_keys})
+    waste_types = dimension_names(db, models.WasteType, {waste_type_id for _, waste_type_id in line_keys})
+    line_volumes = membership @ volume
+    line_receptions = membership @ reception_counts
+
+    lines = []
+    for line, (company_id, waste_type_id) in enumerate(line_keys):
+        lines.append({
+            'company_name': companies.get(company_id, ("-", None))[0],
+            'waste_type': waste_types.get(waste_type_id, ("-", None))[0],
+            'total_volume_m3': float(line_volumes[line]),
+            'reception_count': int(line_receptions[line]),
+            'costs': [
+                {currency: float(line_costs[currency][line, column])
+                 for currency in line_costs if line_priced[currency][line, column]}
+                for column in range(len(names))
+            ]
+        })
+    lines.sort(key=lambda line: line['total_volume_m3'], reverse=True)
+
+    totals = [
+        {currency: float(line_costs[currency][:, column].sum())
+         for currency in line_costs if line_priced[currency][:, column].any()}
+        for column in range(len(names))
+    ]
+
+    return {
+        'scenarios': names,
+        'lines': lines,
+        'totals': totals
+    }
@@ -0,0 +1,252 @@
+# Company rates
+# Rates live in company_rates with effective dates (company_rates_config.py
+# only seeds the table). Lookups go through an immutable in-memory index of
+# the whole table; each process checks the table's version stamp at most
+# every rate_index_refresh_seconds and swaps in a freshly built index when it
+# changed, so every uvicorn worker prices with the same rates without a query
+# per lookup, and old periods are priced with the rates valid at the time.
+
+import threading
+import time
+from bisect import bisect_right
+from collections import namedtuple
+from datetime import date, timedelta
+from types import MappingProxyType
+from typing import Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+import models
+from config import settings
+from company_rates_config import COMPANY_RATES, DEFAULT_RATE_USD
+from dimensions import resolve_company, resolve_waste_type
+
+RateQuote = namedtuple("RateQuote", ["currency", "rate"])
+
+# Charged when no rate covers a company, waste type and date
+DEFAULT_QUOTE = RateQuote("USD", DEFAULT_RATE_USD)
+
+# Seeded rates apply from this date
+SEED_EFFECTIVE_FROM = date(2000, 1, 1)
+
+
+class RateIndex:
+    """
+    Immutable lookup of rates by (company_id, waste_type_id) and date.
+
+    Each key holds its non-overlapping periods sorted by start date, so a
+    lookup is a dict access plus a bisect over a handful of versions.
+    """
+
+    __slots__ = ("version", "_periods", "_changes")
+
+    def __init__(self, version: str, rows: list):
+        """
+        Args:
+            version (str): Version stamp of the table the rows were read from
+            rows (list): Rows with company_id, waste_type_id, currency, rate,
+                effective_from and effective_to
+        """
+        periods = {}
+        for row in sorted(rows, key=lambda r: r.effective_from):
+            periods.setdefault((row.company_id, row.waste_type_id), []).append(
+                (row.effective_from, row.effective_to, RateQuote(row.currency, row.rate))
+            )
+        self.version = version
+        self._periods = MappingProxyType({
+            key: (tuple(start for start, _, _ in entries), tuple(entries))
+            for key, entries in periods.items()
+        })
+        # Days on which any rate starts or stops applying
+        changes = set()
+        for row in rows:
+            changes.add(row.effective_from)
+            if row.effective_to is not None:
+                changes.add(row.effective_to + timedelta(days=1))
+        self._changes = tuple(sorted(changes))
+
+    def _find(self, key: tuple, day: date) -> Optional[RateQuote]:
+        entry = self._periods.get(key)
+        if entry is None:
+            return None
+        starts, entries = entry
+        i = bisect_right(starts, day) - 1
+        if i < 0:
+            return None
+        _, effective_to, quote = entries[i]
+        if effective_to is not None and day > effective_to:
+            return None
+        return quote
+
+    def lookup(self, company_id: Optional[int], waste_type_id: Optional[int], day: date) -> Optional[RateQuote]:
+        """The waste type's rate for the company on day, else the company-wide rate, else None"""
+        return self._find((company_id, waste_type_id), day) or self._find((company_id, None), day)
+
+    def quote(self, company_id: Optional[int], waste_type_id: Optional[int], day: date) -> RateQuote:
+        """Like lookup(), falling back to DEFAULT_QUOTE"""
+        return self.lookup(company_id, waste_type_id, day) or DEFAULT_QUOTE
+
+    def changes_between(self, start: date, end: date) -> tuple:
+        """
+        Days after start and up to end on which some rate starts or stops.
+
+        No rate changes between consecutive days returned (or start), so one
+        lookup prices a whole stretch.
+        """
+        return self._changes[bisect_right(self._changes, start):bisect_right(self._changes, end)]
+
+
+_index = None
+_checked_at = 0.0
+_index_lock = threading.Lock()
+
+
+def rate_version(db: Session) -> str:
+    """Version stamp of company_rates; changes with every insert and edit"""
+    count, max_id, max_updated_at = db.query(
+        func.count(models.CompanyRate.id),
+        func.max(models.CompanyRate.id),
+        func.max(models.CompanyRate.updated_at)
+    ).one()
+    return f"{count}:{max_id}:{max_updated_at}"
+
+
+def get_rate_index(db: Session) -> RateIndex:
+    """
+    Current rate index for this process.
+
+    Re-checks the table's version at most every rate_index_refresh_seconds
+    and rebuilds the index only when it changed; the module reference is
+    swapped in one assignment, so readers never see a partial index.
+    """
+    global _index, _checked_at
+    index = _index
+    if index is not None and time.monotonic() - _checked_at < settings.rate_index_refresh_seconds:
+        return index
+
+    with _index_lock:
+        if _index is not None and time.monotonic() - _checked_at < settings.rate_index_refresh_seconds:
+            return _index
+        version = rate_version(db)
+        if _index is None or _index.version != version:
+            rows = db.query(
+                models.CompanyRate.company_id,
+                models.CompanyRate.waste_type_id,
+                models.CompanyRate.currency,
+                models.CompanyRate.rate,
+                models.CompanyRate.effective_from,
+                models.CompanyRate.effective_to
+            ).all()
+            _index = RateIndex(version, rows)
+        _checked_at = time.monotonic()
+        return _index
+
+
+def invalidate_rate_index() -> None:
+    """Make the next get_rate_index() re-check the table (after a committed rate change)"""
+    global _checked_at
+    _checked_at = 0.0
+
+
+def add_rate(db: Session, company_name: str, waste_type: Optional[str], currency: str, rate: float,
+             effective_from: date, created_by: Optional[int] = None) -> models.CompanyRate:
+    """
+    Add a new rate version, ending the one in effect before it.
+
+    Args:
+        db (Session): Database session (the caller commits)
+        company_name (str): Company, by any of its names
+        waste_type (str): Waste type the rate applies to, or None for a company-wide rate
+        currency (str): "USD" or "EGP"
+        rate (float): Price per m³
+        effective_from (date): First day the rate applies
+        created_by (int): User adding the rate
+
+    Returns:
+        CompanyRate: The new rate
+
+    Raises:
+        ValueError: If a version of this rate already starts on or after
+            effective_from, or the rate would apply in a closed financial month
+    """
+    # The new version prices every day from effective_from on, so none of
+    # those months may be closed
+    if db.query(models.ClosedFinancialPeriod.id).filter(
+        models.ClosedFinancialPeriod.month >= effective_from.replace(day=1)
+    ).first() is not None:
+        raise ValueError("Rates cannot change in a closed financial period")
+
+    company_id = resolve_company(db, company_name)
+    waste_type_id = resolve_waste_type(db, waste_type) if waste_type else None
+
+    versions = db.query(models.CompanyRate).filter(
+        models.CompanyRate.company_id == company_id,
+        models.CompanyRate.waste_type_id.is_(None) if waste_type_id is None
+        else models.CompanyRate.waste_type_id == waste_type_id
+    ).all()
+
+    if any(version.effective_from >= effective_from for version in versions):
+        raise ValueError("A rate version already starts on or after this date")
+
+    for version in versions:
+        if version.effective_to is None or version.effective_to >= effective_from:
+            version.effective_to = effective_from - timedelta(days=1)
+
+    new_rate = models.CompanyRate(
+        company_id=company_id,
+        waste_type_id=waste_type_id,
+        currency=currency,
+        rate=rate,
+        effective_from=effective_from,
+        created_by=created_by
+    )
+    db.add(new_rate)
+    db.flush()
+    return new_rate
+
+
+def seed_rates(db: Session) -> int:
+    """
+    Load COMPANY_RATES into an empty company_rates table.
+
+    Companies priced only by waste type also get a company-wide rate equal
+    to their first listed one, which is what the config lookup fell back to
+    for other waste types.
+
+    Args:
+        db (Session): Database session (committed by this function)
+
+    Returns:
+        int: Number of rates created (0 if the table already had rates)
+    """
+    if db.query(models.CompanyRate.id).first() is not None:
+        return 0
+
+    rates = []
+    first_rates = {}  # company_id -> first (currency, rate) listed for it
+    try:
+        for entry in COMPANY_RATES:
+            currency, rate = ("USD", entry["price_usd"]) if "price_usd" in entry else ("EGP", entry["price_egp"])
+            company_id = resolve_company(db, entry["name"])
+            waste_type_id = resolve_waste_type(db, entry["type"]) if entry.get("type") else None
+            rates.append((company_id, waste_type_id, currency, rate))
+            first_rates.setdefault(company_id, (currency, rate))
+
+        company_wide = {company_id for company_id, waste_type_id, _, _ in rates if waste_type_id is None}
+        for company_id, (currency, rate) in first_rates.items():
+            if company_id not in company_wide:
+                rates.append((company_id, None, currency, rate))
+
+        for company_id, waste_type_id, currency, rate in rates:
+            db.add(models.CompanyRate(
+                company_id=company_id,
+                waste_type_id=waste_type_id,
+                currency=currency,
+                rate=rate,
+                effective_from=SEED_EFFECTIVE_FROM
+            ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return len(rates)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Rebuild the daily_reception_rollups table from vehicle_receptions.
+
+Usage:
+    python rebuild_rollups.py                      # rebuild all history
+    python rebuild_rollups.py 2024-01-01 2024-12-31  # rebuild a date range
+    python rebuild_rollups.py --if-empty           # backfill only if never built (startup)
+"""
+
+import sys
+from datetime import datetime
+import models
+from database import engine, SessionLocal
+from rollups import rebuild_rollups, rollups_empty
+
+
+def main(args: list) -> int:
+    # Make sure the rollup table exists on older databases
+    models.Base.metadata.create_all(bind=engine, tables=[models.DailyReceptionRollup.__table__])
+
+    db = SessionLocal()
+    try:
+        if "--if-empty" in args:
+            if not rollups_empty(db):
+                print("ℹ️  Daily rollups already built, skipping backfill")
+                return 0
+            args = [arg for arg in args if arg != "--if-empty"]
+
+        try:
+            dates = [datetime.strptime(arg, "%Y-%m-%d").date() for arg in args]
+        except ValueError:
+            print("❌ Invalid date format. Use YYYY-MM-DD")
+            return 1
+
+        start = dates[0] if len(dates) > 0 else None
+        end = dates[1] if len(dates) > 1 else start
+
+        period = f"{start} to {end}" if start else "all history"
+        print(f"🔄 Rebuilding daily reception rollups for {period}...")
+        rows = rebuild_rollups(db, start, end)
+        print(f"✅ Wrote {rows} rollup rows")
+        return 0
+
+    except Exception as e:
+        print(f"❌ Error rebuilding rollups: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Rebuild the reception full-text search index from vehicle_receptions and vehicles.
+
+Usage:
+    python rebuild_search_index.py              # rebuild the whole index
+    python rebuild_search_index.py --if-empty   # backfill only if never built (startup)
+"""
+
+import sys
+from database import engine, SessionLocal
+from search_index import create_search_index, rebuild_search_index, search_index_empty
+
+
+def main(args: list) -> int:
+    # Make sure the search table exists on older databases
+    with engine.begin() as connection:
+        create_search_index(connection)
+
+    db = SessionLocal()
+    try:
+        if "--if-empty" in args and not search_index_empty(db):
+            print("ℹ️  Search index already built, skipping backfill")
+            return 0
+
+        print("🔄 Rebuilding reception search index...")
+        count = rebuild_search_index(db)
+        print(f"✅ Indexed {count} receptions")
+        return 0
+
+    except Exception as e:
+        print(f"❌ Error rebuilding search index: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,145 @@
+# Bounded worker pool for PDF report rendering
+# ReportLab/PyPDF2 rendering is synchronous and CPU-bound; running it on the
+# event loop stalls every other request on the worker. Renders run on a small
+# thread pool instead, and requests beyond the pool plus a short queue are
+# rejected with 503 so the API stays responsive under month-end load.
+
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+from fastapi import HTTPException, status
+from config import settings
+
+
+class RenderPool:
+    """Thread pool with a concurrency limit and a bounded wait queue"""
+
+    def __init__(self, max_workers: int, queue_depth: int):
+        self.max_workers = max_workers
+        self.queue_depth = queue_depth
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-render")
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Renders currently running or waiting for a worker"""
+        return self._pending
+
+    def _reserve(self) -> None:
+        with self._lock:
+            if self._pending >= self.max_workers + self.queue_depth:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Report rendering is at capacity, please retry shortly",
+                    headers={"Retry-After": "5"}
+                )
+            self._pending += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def reserve(self) -> "RenderSlot":
+        """Reserve a slot for a render driven outside the pool (e.g. a streamed response)"""
+        self._reserve()
+        return RenderSlot(self)
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) on the pool without blocking the event loop"""
+        self._reserve()
+        try:
+            future = self._executor.submit(partial(func, *args, **kwargs))
+        except Exception:
+            self._release()
+            raise
+        # Release when the render actually finishes, even if the client went away
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        """Current load, for monitoring"""
+        return {
+            "max_workers": self.max_workers,
+            "queue_depth": self.queue_depth,
+            "pending": self._pending,
+        }
+
+
+class RenderSlot:
+    """A reserved render pool slot; release() is safe to call more than once"""
+
+    def __init__(self, pool: RenderPool):
+        self._pool = pool
+        self._released = False
+
+    def release(self) -> None:
+        with self._pool._lock:
+            if self._released:
+                return
+            self._released = True
+            self._pool._pending -= 1
+
+
+render_pool = RenderPool(
+    max_workers=settings.report_render_workers,
+    queue_depth=settings.report_render_queue_depth
+)
+
+_process_pool = None
+_batch_process_pool = None
+_process_pool_lock = threading.Lock()
+
+
+def _spawn_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    # Spawned rather than forked: the API process is multi-threaded
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def get_render_process_pool() -> Optional[ProcessPoolExecutor]:
+    """Process pool for page-parallel rendering of large reports, or None when disabled"""
+    global _process_pool
+    if settings.report_render_processes < 2:
+        return None
+    with _process_pool_lock:
+        if _process_pool is None:
+            _process_pool = _spawn_process_pool(settings.report_render_processes)
+        return _process_pool
+
+
+def reset_render_process_pool() -> None:
+    """Drop a broken process pool (e.g. after a worker died) so the next call starts a fresh one"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+
+
+def get_batch_process_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Process pool rendering the per-company reports of a batch in parallel, or
+    None on a single CPU or when disabled. Workers start on demand, so a batch
+    of few companies only spawns as many as it uses.
+    """
+    global _batch_process_pool
+    workers = min(settings.report_batch_processes, os.cpu_count() or 1)
+    if workers < 2:
+        return None
+    with _process_pool_lock:
+        if _batch_process_pool is None:
+            _batch_process_pool = _spawn_process_pool(workers)
+        return _batch_process_pool
+
+
+def reset_batch_process_pool() -> None:
+    """Drop a broken batch process pool so the next batch starts a fresh one"""
+    global _batch_process_pool
+    with _process_pool_lock:
+        if _batch_process_pool is not None:
+            _batch_process_pool.shutdown(wait=False, cancel_futures=True)
+            _batch_process_pool = None
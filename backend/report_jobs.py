@@ -0,0 +1,190 @@
+# Background report jobs
+# Large reports are submitted as jobs, rendered on a background worker and
+# stored on local disk until they expire, so clients poll and download instead
+# of holding a connection open for the whole render. Identical requests that
+# are still queued or running share one job. Job state lives in this process
+# (the app runs a single uvicorn worker); stored files outlive restarts only
+# until the expiry sweep removes them.
+
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Optional
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+from config import settings
+from database import SessionLocal
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class ReportJob:
+    """State of one report job"""
+
+    def __init__(self, kind: str, key: str, filename: str, owner_id: int):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.key = key
+        self.filename = filename
+        self.owner_ids = {owner_id}
+        self.status = JOB_QUEUED
+        self.stage = "queued"
+        self.progress = 0.0
+        self.error = None
+        self.path = None
+        self.size_bytes = None
+        self.created_at = datetime.now()
+        self.finished_at = None
+        self.expires_at = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_DONE, JOB_FAILED)
+
+    def set_stage(self, stage: str, progress: float) -> None:
+        self.stage = stage
+        self.progress = progress
+
+
+class ReportJobManager:
+    """Runs report jobs on a background worker and keeps their results on disk"""
+
+    def __init__(self, store_dir: str, ttl_seconds: int, max_workers: int, max_pending: int):
+        self.store_dir = store_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-job")
+        self._jobs = {}  # job id -> ReportJob
+        self._inflight = {}  # request key -> job id, while queued or running
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        kind: str,
+        key: str,
+        filename: str,
+        owner_id: int,
+        load: Callable[[Session], Any],
+        render: Callable[[Any], bytes]
+    ) -> ReportJob:
+        """
+        Queue a report job, or join the identical one already in flight.
+
+        Args:
+            kind (str): Report kind, e.g. "report" or "financial"
+            key (str): Normalised request key used to coalesce identical jobs
+            filename (str): Download filename
+            owner_id (int): Submitting user id
+            load (callable): Queries the report data using the given session
+            render (callable): Renders the loaded data to PDF bytes
+
+        Returns:
+            ReportJob: The new or coalesced job
+        """
+        self.sweep()
+
+        with self._lock:
+            job_id = self._inflight.get(key)
+            if job_id is not None:
+                job = self._jobs[job_id]
+                job.owner_ids.add(owner_id)
+                return job
+
+            pending = sum(1 for job in self._jobs.values() if not job.finished)
+            if pending >= self.max_pending:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many report jobs in progress, please retry shortly",
+                    headers={"Retry-After": "30"}
+                )
+
+            job = ReportJob(kind, key, filename, owner_id)
+            self._jobs[job.id] = job
+            self._inflight[key] = job.id
+
+        self._executor.submit(self._run, job, load, render)
+        return job
+
+    def get(self, job_id: str, user) -> Optional[ReportJob]:
+        """Return a job visible to user (its submitters, or any super admin)"""
+        self.sweep()
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        if user.role != "super_admin" and user.id not in job.owner_ids:
+            return None
+        return job
+
+    def _run(self, job: ReportJob, load: Callable[[Session], Any], render: Callable[[Any], bytes]) -> None:
+        job.status = JOB_RUNNING
+        try:
+            job.set_stage("querying", 0.1)
+            db = SessionLocal()
+            try:
+                data = load(db)
+            finally:
+                db.close()
+
+            job.set_stage("rendering", 0.4)
+            content = render(data)
+
+            job.set_stage("storing", 0.9)
+            os.makedirs(self.store_dir, exist_ok=True)
+            path = os.path.join(self.store_dir, f"{job.id}.pdf")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+            job.path = path
+            job.size_bytes = len(content)
+            job.status = JOB_DONE
+            job.set_stage("done", 1.0)
+        except Exception as e:
+            print(f"❌ Report job {job.id} failed: {e}")
+            job.status = JOB_FAILED
+            job.stage = "failed"
+            job.error = e.detail if isinstance(e, HTTPException) else str(e)
+        finally:
+            job.finished_at = datetime.now()
+            job.expires_at = job.finished_at + timedelta(seconds=self.ttl_seconds)
+            with self._lock:
+                if self._inflight.get(job.key) == job.id:
+                    del self._inflight[job.key]
+
+    def sweep(self) -> None:
+        """Forget expired jobs and delete their files, including leftovers from earlier runs"""
+        now = datetime.now()
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.expires_at and job.expires_at <= now]
+            for job in expired:
+                del self._jobs[job.id]
+            live_files = {os.path.basename(job.path) for job in self._jobs.values() if job.path}
+
+        for job in expired:
+            if job.path and os.path.exists(job.path):
+                os.remove(job.path)
+
+        if not os.path.isdir(self.store_dir):
+            return
+        cutoff = now.timestamp() - self.ttl_seconds
+        for name in os.listdir(self.store_dir):
+            path = os.path.join(self.store_dir, name)
+            if name not in live_files and os.path.getmtime(path) < cutoff:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+report_jobs = ReportJobManager(
+    store_dir=settings.report_job_dir,
+    ttl_seconds=settings.report_job_ttl_seconds,
+    max_workers=settings.report_job_workers,
+    max_pending=settings.report_job_max_pending
+)
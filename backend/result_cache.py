@@ -0,0 +1,113 @@
+# In-process result cache for summary and financial endpoints
+# Entries are tagged with the data version current when they were computed;
+# every reception write bumps the version, so stale entries are dropped on
+# their next lookup. The TTL bounds staleness across uvicorn workers, which
+# each keep their own cache and version counter.
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from config import settings
+
+_data_version = 0
+_version_lock = threading.Lock()
+
+
+def get_data_version() -> int:
+    """Current reception data version for this process"""
+    return _data_version
+
+
+def bump_data_version() -> int:
+    """Invalidate cached results after a committed reception write"""
+    global _data_version
+    with _version_lock:
+        _data_version += 1
+        return _data_version
+
+
+def normalize_filter(value: Optional[str]) -> Optional[str]:
+    """Normalise an ilike filter value for use in a cache key"""
+    if value is None:
+        return None
+    value = value.strip().lower()
+    return value or None
+
+
+class ResultCache:
+    """LRU cache with a TTL whose entries are invalidated by the data version"""
+
+    def __init__(self, maxsize: int = 256, ttl_seconds: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (version, expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value for key, or None if missing, expired or stale"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                version, expires_at, value = entry
+                if version == get_data_version() and expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any, version: Optional[int] = None) -> None:
+        """Store a value computed at `version` (defaults to the current version)"""
+        if self.maxsize <= 0:
+            return
+        if version is None:
+            version = get_data_version()
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and caching it on a miss"""
+        value = self.get(key)
+        if value is not None:
+            return value
+        # Tag with the version seen before computing so a write that lands
+        # mid-computation leaves the entry stale rather than wrongly fresh
+        version = get_data_version()
+        value = compute()
+        self.set(key, value, version)
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and sizing, for tuning"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "data_version": get_data_version(),
+            }
+
+
+summary_cache = ResultCache(
+    maxsize=settings.result_cache_size,
+    ttl_seconds=settings.result_cache_ttl_seconds
+)
@@ -0,0 +1,130 @@
+# Daily reception rollups
+# Keeps daily_reception_rollups in step with vehicle_receptions so summary
+# endpoints aggregate ~one row per (day, company, waste type) instead of
+# every reception in the period.
+
+from datetime import date, datetime, timedelta
+from typing import Optional
+from sqlalchemy import func, delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+import models
+
+ROLLUP_MEASURES = ("reception_count", "vehicle_count", "total_quantity", "cutting_boxes_amount")
+
+
+def reception_rollup_values(reception: models.VehicleReception) -> dict:
+    """
+    Snapshot the rollup key and measures contributed by a reception.
+
+    Args:
+        reception (VehicleReception): Reception to snapshot (before or after a change)
+
+    Returns:
+        dict: Rollup key and measures, or None if the reception does not count
+    """
+    if reception.is_active is False:
+        return None
+
+    return {
+        "day": reception.date.date() if isinstance(reception.date, datetime) else reception.date,
+        "company_name": reception.company_name,
+        "water_type": reception.water_type,
+        "reception_count": 1,
+        "vehicle_count": reception.number_of_vehicles or 0,
+        "total_quantity": reception.total_quantity or 0.0,
+        "cutting_boxes_amount": reception.cutting_boxes_amount or 0.0,
+    }
+
+
+def apply_rollup_delta(db: Session, values: Optional[dict], sign: int = 1) -> None:
+    """
+    Add (sign=1) or subtract (sign=-1) a reception snapshot from its rollup row.
+
+    Runs as a single INSERT ... ON CONFLICT DO UPDATE in the caller's
+    transaction, so the rollup commits or rolls back with the reception write.
+    """
+    if values is None:
+        return
+
+    table = models.DailyReceptionRollup.__table__
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+
+    row = {key: values[key] for key in ("day", "company_name", "water_type")}
+    row.update({measure: sign * values[measure] for measure in ROLLUP_MEASURES})
+
+    stmt = dialect_insert(table).values(**row)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.day, table.c.company_name, table.c.water_type],
+        set_={
+            **{measure: table.c[measure] + stmt.excluded[measure] for measure in ROLLUP_MEASURES},
+            "updated_at": func.now(),
+        }
+    )
+    db.execute(stmt)
+
+
+def record_reception(db: Session, reception: models.VehicleReception) -> None:
+    """Add a new or updated reception to the rollup"""
+    apply_rollup_delta(db, reception_rollup_values(reception), 1)
+
+
+def unrecord_reception(db: Session, reception: models.VehicleReception) -> None:
+    """Remove a reception (about to be soft deleted) from the rollup"""
+    apply_rollup_delta(db, reception_rollup_values(reception), -1)
+
+
+def rebuild_rollups(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> int:
+    """
+    Recompute rollup rows from vehicle_receptions, for backfill or drift repair.
+
+    Args:
+        db (Session): Database session (committed by this function)
+        start (date): First day to rebuild (optional, defaults to all history)
+        end (date): Last day to rebuild, inclusive (optional)
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    rollup = models.DailyReceptionRollup
+    reception = models.VehicleReception
+    day = func.date(reception.date)
+
+    clear = delete(rollup)
+    source = select(
+        day,
+        reception.company_name,
+        reception.water_type,
+        func.count(reception.id),
+        func.coalesce(func.sum(reception.number_of_vehicles), 0),
+        func.coalesce(func.sum(reception.total_quantity), 0.0),
+        func.coalesce(func.sum(reception.cutting_boxes_amount), 0.0),
+    ).where(reception.is_active == True)
+
+    if start:
+        clear = clear.where(rollup.day >= start)
+        source = source.where(reception.date >= datetime.combine(start, datetime.min.time()))
+    if end:
+        clear = clear.where(rollup.day <= end)
+        source = source.where(reception.date < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+
+    source = source.group_by(day, reception.company_name, reception.water_type)
+
+    try:
+        db.execute(clear)
+        result = db.execute(
+            insert(rollup).from_select(
+                ["day", "company_name", "water_type", *ROLLUP_MEASURES], source
+            )
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return result.rowcount
+
+
+def rollups_empty(db: Session) -> bool:
+    """True if the rollup table has no rows yet"""
+    return db.query(models.DailyReceptionRollup.id).first() is None
@@ -1,19 +1,35 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from collections import OrderedDict
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 import models
 import schemas
 from database import get_db
 from config import settings
+import threading
+import time
 
 router = APIRouter()
 security = HTTPBearer()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Per-process authentication caches. A token's signature is verified once and
+# the result kept in an LRU until the token expires; users are cached by
+# username (the token subject) for auth_user_cache_ttl_seconds. Changes made
+# through this API invalidate the user at once; other workers pick them up
+# when the TTL runs out.
+_token_cache = OrderedDict()  # token -> (username, expires_at)
+_user_cache = {}  # username -> (cached_at, column values)
+_user_invalidations = 0
+_auth_cache_lock = threading.Lock()
+
+USER_COLUMNS = tuple(attribute.key for attribute in inspect(models.User).column_attrs)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash"""
@@ -38,6 +54,73 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def decode_token_subject(token: str) -> Optional[str]:
+    """
+    Username a token was issued for, verifying the signature only the first time the token is seen.
+    
+    Raises:
+        JWTError: If the token is invalid or has expired
+    """
+    with _auth_cache_lock:
+        entry = _token_cache.get(token)
+        if entry is not None:
+            username, expires_at = entry
+            if expires_at > time.time():
+                _token_cache.move_to_end(token)
+                return username
+            del _token_cache[token]
+    
+    payload = jwt.decode(token, settings.secret_key, algorithms=[settings.jwt_algorithm])
+    username = payload.get("sub")
+    if username is not None:
+        with _auth_cache_lock:
+            _token_cache[token] = (username, payload.get("exp", float("inf")))
+            while len(_token_cache) > settings.auth_token_cache_size:
+                _token_cache.popitem(last=False)
+    return username
+
+
+def get_active_user(db: Session, username: str) -> Optional[models.User]:
+    """
+    Active user by username, from the per-process cache while fresh.
+    
+    Returns a detached copy on every call, so a request cannot change the
+    cached user; load the user into the request's session to update it.
+    """
+    with _auth_cache_lock:
+        entry = _user_cache.get(username)
+        invalidations = _user_invalidations
+    
+    if entry is None or time.monotonic() - entry[0] >= settings.auth_user_cache_ttl_seconds:
+        user = db.query(models.User).filter(
+            models.User.username == username,
+            models.User.is_active == True
+        ).first()
+        if user is None:
+            return None
+        
+        entry = (time.monotonic(), {key: getattr(user, key) for key in USER_COLUMNS})
+        with _auth_cache_lock:
+            # Skip storing if the user was invalidated while it was loading
+            if invalidations == _user_invalidations:
+                _user_cache[username] = entry
+    
+    user = models.User(**entry[1])
+    make_transient_to_detached(user)
+    return user
+
+
+def invalidate_user(username: Optional[str] = None) -> None:
+    """Drop a user (or every user) from the cache after a committed change"""
+    global _user_invalidations
+    with _auth_cache_lock:
+        _user_invalidations += 1
+        if username is None:
+            _user_cache.clear()
+        else:
+            _user_cache.pop(username, None)
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -50,22 +133,14 @@ async def get_current_user(
     )
     
     try:
-        payload = jwt.decode(
-            credentials.credentials,
-            settings.secret_key,
-            algorithms=[settings.jwt_algorithm]
-        )
-        username: str = payload.get("sub")
+        username = decode_token_subject(credentials.credentials)
         if username is None:
             raise credentials_exception
         token_data = schemas.TokenData(username=username)
     except JWTError:
         raise credentials_exception
     
-    user = db.query(models.User).filter(
-        models.User.username == token_data.username,
-        models.User.is_active == True
-    ).first()
+    user = get_active_user(db, token_data.username)
     
     if user is None:
         raise credentials_exception
@@ -158,6 +233,7 @@ async def register_user(user_data: schemas.UserCreate, db: Session = Depends(get
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    invalidate_user(db_user.username)
     
     return db_user
 
@@ -199,13 +275,17 @@ async def update_current_user(
 ):
     """Update current user information"""
     
+    # current_user is a cached copy; update the row through this session
+    db_user = db.query(models.User).filter(models.User.id == current_user.id).first()
+    
     # Update fields
     update_data = user_data.dict(exclude_unset=True)
     for field, value in update_data.items():
         if field != "role":  # Users can't change their own role
-            setattr(current_user, field, value)
+            setattr(db_user, field, value)
     
     db.commit()
-    db.refresh(current_user)
+    db.refresh(db_user)
+    invalidate_user(db_user.username)
     
-    return current_user
\ No newline at end of file
+    return db_user
\ No newline at end of file
@@ -1,13 +1,35 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Response, Query, Header
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import and_, func, tuple_, cast, literal_column, Date, DateTime
 import models
 import schemas
-from database import get_db
+from database import get_db, SessionLocal
 from routers.auth import get_current_user, require_super_admin, require_admin_or_above
-from company_rates_config import get_company_rate, get_all_company_rates, DEFAULT_RATE_USD, DEFAULT_RATE_EGP
+from result_cache import summary_cache, normalize_filter, bump_data_version
+from render_pool import (
+    render_pool, get_render_process_pool, reset_render_process_pool, get_batch_process_pool, reset_batch_process_pool
+)
+from config import settings
+from pdf_cache import pdf_cache, pdf_cache_key
+from streaming_pdf import PdfPageCanvas, StreamingPdfCanvas
+from zip_stream import ZipStreamBuffer
+from xlsx_stream import XlsxStreamWriter, XLSX_MEDIA_TYPE, STYLE_BOLD, STYLE_NUMBER, STYLE_BOLD_NUMBER
+from report_jobs import report_jobs, JOB_DONE, JOB_FAILED
+from dimensions import (
+    company_ids_matching, waste_type_ids_matching, company_names_matching, waste_type_names_matching, find_company
+)
+from company_rates_config import DEFAULT_RATE_USD, DEFAULT_RATE_EGP
+from rates import add_rate, get_rate_index, invalidate_rate_index
+from exchange_rates import get_exchange_rate_index, invalidate_exchange_rate_index
+from financials import load_financials, close_period
+from rate_scenarios import scenario_rate_table, simulate_rates
 from datetime import datetime, timedelta
+from collections import namedtuple
+from concurrent.futures import as_completed
+from concurrent.futures.process import BrokenProcessPool
 import io
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
@@ -19,7 +41,12 @@ from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfgen import canvas
 from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import ArrayObject, DecodedStreamObject, DictionaryObject, FloatObject, IndirectObject, NameObject
+import json
 import os
+import re
+import zipfile
+import threading
 
 # Use standard fonts for English-only reports
 PDF_FONT = 'Helvetica'
@@ -92,24 +119,29 @@ def create_overlay_pdf(receptions: list, report_info: dict) -> bytes:
     buffer = io.BytesIO()
     # Use A4 size to match typical templates
     c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
     
-    # Start from top of page, leaving space for template header
-    y_position = height - 200  # Start below template header
+    for _ in draw_reception_report(c, receptions, {'total_records': len(receptions), **report_info}):
+        pass
     
-    # Report title and info
-    c.setFont(PDF_FONT_BOLD, 16)
-    title_text = f"Vehicle Reception Report - {report_info['type'].title()}"
-    c.drawString((width - c.stringWidth(title_text, PDF_FONT_BOLD, 16)) / 2, y_position, title_text)
-    
-    y_position -= 30
-    c.setFont(PDF_FONT, 12)
+    c.save()
+    buffer.seek(0)
     
-    # Report info
+    return buffer.getvalue()
+
+
+# Operational report page geometry (points)
+REPORT_TABLE_TOP = 200  # Content starts this far below the top, under the letterhead
+REPORT_PAGE_BOTTOM = 120  # A new page starts once rows reach this height
+REPORT_ROW_HEIGHT = 12
+REPORT_TABLE_HEADER_HEIGHT = 20  # Header row plus the gap below its rule
+
+
+def report_info_lines(report_info: dict) -> list:
+    """Summary lines printed under the operational report title"""
     report_info_text = [
         f"Report Period: {report_info['start_date'].strftime('%Y-%m-%d')} to {report_info['end_date'].strftime('%Y-%m-%d')}",
         f"Generated On: {datetime.now().strftime('%Y-%m-%d %H:%M')}",
-        f"Total Records: {len(receptions)}"
+        f"Total Records: {report_info['total_records']}"
     ]
     
     if report_info.get('total_vehicles'):
@@ -118,13 +150,50 @@ def create_overlay_pdf(receptions: list, report_info: dict) -> bytes:
     if report_info.get('total_quantity'):
         report_info_text.append(f"Total Quantity: {report_info['total_quantity']:.2f} m³")
     
-    for info in report_info_text:
-        c.drawString(50, y_position, info)
-        y_position -= 20
+    return report_info_text
+
+
+def reception_rows_per_page(report_info: dict, first_page: bool) -> int:
+    """Number of rows draw_reception_report fits on the first or a following page"""
+    width, height = A4
+    y_position = height - REPORT_TABLE_TOP
+    if first_page:
+        y_position -= 30 + 20 * len(report_info_lines(report_info)) + 20
+    y_position -= REPORT_TABLE_HEADER_HEIGHT
+    return int((y_position - REPORT_PAGE_BOTTOM) // REPORT_ROW_HEIGHT) + 1
+
+
+def draw_reception_report(c, receptions, report_info: dict, heading: bool = True):
+    """
+    Draw the operational report onto canvas c, yielding after each finished page.
+    
+    c may be a ReportLab canvas or a StreamingPdfCanvas, and receptions any
+    iterable of rows (e.g. a server-side cursor); report_info must carry
+    'total_records'. With heading=False only table pages are drawn, for
+    rendering a page-aligned slice of a report. The caller saves the canvas.
+    """
+    width, height = A4
     
-    y_position -= 20
+    # Start from top of page, leaving space for template header
+    y_position = height - REPORT_TABLE_TOP  # Start below template header
+    
+    if heading:
+        # Report title and info
+        c.setFont(PDF_FONT_BOLD, 16)
+        title_text = f"Vehicle Reception Report - {report_info['type'].title()}"
+        c.drawString((width - c.stringWidth(title_text, PDF_FONT_BOLD, 16)) / 2, y_position, title_text)
+        
+        y_position -= 30
+        c.setFont(PDF_FONT, 12)
+        
+        # Report info
+        for info in report_info_lines(report_info):
+            c.drawString(50, y_position, info)
+            y_position -= 20
+        
+        y_position -= 20
     
-    if receptions:
+    if report_info['total_records']:
         # Table headers - optimized for A4 width
         headers = ['Date', 'Company', 'Vehicles', 'Water Type', 'Quantity (m³)', 'Arrival', 'Departure']
         
@@ -151,10 +220,11 @@ def create_overlay_pdf(receptions: list, report_info: dict) -> bytes:
         c.setFont(PDF_FONT, 8)
         for reception in receptions:
             # Check if we need a new page (ensure space for at least 2 rows)
-            if y_position < 120:  # Start new page if near bottom
+            if y_position < REPORT_PAGE_BOTTOM:  # Start new page if near bottom
                 c.showPage()
+                yield
                 # Reset to template spacing for new page
-                y_position = height - 200  # Start below template header
+                y_position = height - REPORT_TABLE_TOP  # Start below template header
                 # Redraw headers on new page
                 y_position = draw_table_headers(y_position)
                 c.setFont(PDF_FONT, 8)
@@ -175,14 +245,24 @@ def create_overlay_pdf(receptions: list, report_info: dict) -> bytes:
                     data = str(data)[:int(col_widths[i]/6)] + "..."
                 c.drawString(x_positions[i], y_position, str(data))
             
-            y_position -= 12  # Reduced row height for more content per page
+            y_position -= REPORT_ROW_HEIGHT  # Reduced row height for more content per page
     else:
         c.drawString(50, y_position, "No records found for the specified period.")
-    
-    c.save()
-    buffer.seek(0)
-    
-    return buffer.getvalue()
+
+
+def currency_symbol(currency: str) -> str:
+    """Prefix for amounts in a currency on financial reports"""
+    return '$' if currency == 'USD' else 'EGP '
+
+
+def financial_line_company(line: dict) -> str:
+    """English company name of a financial cost line"""
+    return clean_text_for_pdf(line.get('company_name_en') or translate_to_english(line['company_name']))
+
+
+def financial_line_waste_type(line: dict) -> str:
+    """English waste type of a financial cost line"""
+    return clean_text_for_pdf(line.get('waste_type_en') or translate_to_english(line['waste_type']))
 
 
 def create_financial_overlay_pdf(financial_data: dict) -> bytes:
@@ -207,10 +287,23 @@ def create_financial_overlay_pdf(financial_data: dict) -> bytes:
     report_info_text = [
         f"Report Period: {financial_data['period_start']} to {financial_data['period_end']}",
         f"Generated On: {financial_data['generated_at'].strftime('%Y-%m-%d %H:%M:%S')}",
-        f"Total Companies: {len(financial_data['companies'])}",
+        f"Total Companies: {len({line['company_name'] for line in financial_data['companies']})}",
         f"Total Volume: {financial_data['total_volume_m3']:.2f} m³",
-        f"Total Cost: ${financial_data['total_cost']:,.2f}"
     ]
+    for total in financial_data['currency_totals']:
+        report_info_text.append(
+            f"Total Cost ({total['currency']}): {currency_symbol(total['currency'])}{total['total_cost']:,.2f}"
+        )
+    converted = financial_data.get('converted_total')
+    if converted:
+        report_info_text.append(
+            f"Total Cost (all in {converted['currency']}): "
+            f"{currency_symbol(converted['currency'])}{converted['total_cost']:,.2f}"
+        )
+        report_info_text.append(
+            f"Exchange Rate: 1 USD = {converted['egp_per_usd']:,.4g} EGP "
+            f"(set {converted['exchange_rate_day'].strftime('%Y-%m-%d')})"
+        )
     
     for info in report_info_text:
         c.drawString(50, y_position, info)
@@ -220,10 +313,10 @@ def create_financial_overlay_pdf(financial_data: dict) -> bytes:
     
     if financial_data['companies']:
         # Table headers - optimized for A4 width
-        headers = ['Company Name', 'Volume (m³)', 'Rate per m³', 'Total Cost', 'Receptions']
+        headers = ['Company Name', 'Waste Type', 'Volume (m³)', 'Rate per m³', 'Total Cost', 'Receptions']
         
         # Calculate column widths to fit A4 page (max width ~495 points with margins)
-        col_widths = [130, 75, 75, 95, 70]  # Total: 445 points
+        col_widths = [110, 100, 65, 65, 90, 60]  # Total: 490 points
         x_positions = [50]
         for width in col_widths[:-1]:
             x_positions.append(x_positions[-1] + width)
@@ -254,14 +347,14 @@ def create_financial_overlay_pdf(financial_data: dict) -> bytes:
                 c.setFont(PDF_FONT, 8)
             
             # Format rate and cost with proper currency
-            currency = company_data.get('currency', 'USD')
-            currency_symbol = '$' if currency == 'USD' else 'EGP'
+            symbol = currency_symbol(company_data['currency'])
             
             row_data = [
-                clean_text_for_pdf(translate_to_english(company_data['company_name']))[:16],  # Truncate company names
+                financial_line_company(company_data)[:16],  # Truncate company names
+                financial_line_waste_type(company_data)[:16],
                 f"{company_data['total_volume_m3']:.1f}",  # One decimal place
-                f"{currency_symbol}{company_data['rate_per_m3']:.2f}",
-                f"{currency_symbol}{company_data['total_cost']:,.0f}",  # No decimal for cost display
+                f"{symbol}{company_data['rate_per_m3']:.2f}",
+                f"{symbol}{company_data['total_cost']:,.0f}",  # No decimal for cost display
                 str(company_data['reception_count'])
             ]
             
@@ -280,16 +373,27 @@ def create_financial_overlay_pdf(financial_data: dict) -> bytes:
         # Draw separator line before totals
         c.line(50, y_position + 4, sum(col_widths) + 50, y_position + 4)
         
-        totals_data = [
-            'TOTAL',
-            f"{financial_data['total_volume_m3']:.1f}",
-            '-',
-            f"${financial_data['total_cost']:,.0f}",
-            str(sum(c['reception_count'] for c in financial_data['companies']))
-        ]
+        # One totals row per currency; costs in different currencies are never added
+        for total in financial_data['currency_totals']:
+            totals_data = [
+                f"TOTAL ({total['currency']})",
+                '',
+                f"{total['total_volume_m3']:.1f}",
+                '-',
+                f"{currency_symbol(total['currency'])}{total['total_cost']:,.0f}",
+                str(total['reception_count'])
+            ]
+            
+            for i, data in enumerate(totals_data):
+                c.drawString(x_positions[i], y_position, str(data))
+            y_position -= 12
         
-        for i, data in enumerate(totals_data):
-            c.drawString(x_positions[i], y_position, str(data))
+        if converted:
+            c.drawString(x_positions[0], y_position, f"TOTAL (all in {converted['currency']})")
+            c.drawString(
+                x_positions[4], y_position,
+                f"{currency_symbol(converted['currency'])}{converted['total_cost']:,.0f}"
+            )
     else:
         c.drawString(50, y_position, "No financial data found for the specified period.")
     
@@ -299,36 +403,130 @@ def create_financial_overlay_pdf(financial_data: dict) -> bytes:
     return buffer.getvalue()
 
 
+TEMPLATE_PATH = "/app/template.pdf"
+LETTERHEAD_XOBJECT = "/PetroLetterhead"
+
+# Columns drawn by the operational report, selected without loading ORM objects
+REPORT_ROW_COLUMNS = (
+    models.VehicleReception.date,
+    models.VehicleReception.company_name,
+    models.VehicleReception.number_of_vehicles,
+    models.VehicleReception.water_type,
+    models.VehicleReception.total_quantity,
+    models.VehicleReception.arrival_time,
+    models.VehicleReception.departure_time,
+)
+
+# A picklable operational report row, for rendering in worker processes
+ReportRow = namedtuple("ReportRow", [column.key for column in REPORT_ROW_COLUMNS])
+
+# Rows fetched per round trip when streaming a report
+REPORT_STREAM_BATCH_SIZE = 1000
+
+
+class LetterheadTemplate:
+    """
+    The letterhead template parsed once and kept as a Form XObject.
+    
+    Each report copies the form into its writer a single time and every page
+    draws it with one `Do` operator, instead of re-reading template.pdf and
+    merging its content stream into each page.
+    """
+    
+    def __init__(self, path: str, mtime: float):
+        self.path = path
+        self.mtime = mtime
+        self._reader = PdfReader(path)
+        self._lock = threading.Lock()  # PdfReader resolves objects lazily and is not thread-safe
+        self.form = None
+        
+        if len(self._reader.pages) > 0:
+            page = self._reader.pages[0]
+            contents = page.get_contents()
+            form = DecodedStreamObject()
+            form.set_data(contents.get_data() if contents is not None else b"")
+            form[NameObject("/Type")] = NameObject("/XObject")
+            form[NameObject("/Subtype")] = NameObject("/Form")
+            form[NameObject("/BBox")] = ArrayObject([FloatObject(v) for v in page.mediabox])
+            if "/Resources" in page:
+                form[NameObject("/Resources")] = page["/Resources"]
+            self.form = form
+    
+    def add_to(self, writer: PdfWriter) -> IndirectObject:
+        """Copy the form (and the fonts/images it uses) into writer once; return its reference"""
+        with self._lock:
+            # PyPDF2 3.0 has no public add_object
+            return writer._add_object(self.form.clone(writer))
+
+
+_letterhead: Optional[LetterheadTemplate] = None
+_letterhead_lock = threading.Lock()
+
+
+def get_letterhead(template_path: Optional[str] = None) -> Optional[LetterheadTemplate]:
+    """Return the parsed letterhead, reloading it only when the file's mtime changes"""
+    global _letterhead
+    template_path = template_path or TEMPLATE_PATH
+    
+    try:
+        mtime = os.stat(template_path).st_mtime
+    except OSError:
+        return None
+    
+    with _letterhead_lock:
+        if _letterhead is None or _letterhead.path != template_path or _letterhead.mtime != mtime:
+            _letterhead = LetterheadTemplate(template_path, mtime)
+            print(f"📄 Loaded report template from {template_path}")
+        return _letterhead
+
+
 def merge_with_template(overlay_pdf_bytes: bytes, is_financial: bool = False) -> bytes:
     """Merge overlay content with the PDF template"""
     
-    template_path = "/app/template.pdf"
+    try:
+        letterhead = get_letterhead()
+    except Exception as e:
+        print(f"❌ Error loading template: {str(e)}")
+        letterhead = None
     
     # Check if template exists
-    if not os.path.exists(template_path):
-        print(f"⚠️ Template not found at {template_path}, using overlay only")
+    if letterhead is None:
+        print(f"⚠️ Template not found at {TEMPLATE_PATH}, using overlay only")
         return overlay_pdf_bytes
     
     try:
-        # Read the template
-        template_reader = PdfReader(template_path)
         overlay_reader = PdfReader(io.BytesIO(overlay_pdf_bytes))
         
         writer = PdfWriter()
         
-        # Process each page of the overlay
-        for page_num in range(len(overlay_reader.pages)):
-            # Get template page (use first page for all overlay pages)
-            if len(template_reader.pages) > 0:
-                template_page = template_reader.pages[0]
-                overlay_page = overlay_reader.pages[page_num]
+        if letterhead.form is None:
+            # If no template page, just use overlay
+            for overlay_page in overlay_reader.pages:
+                writer.add_page(overlay_page)
+        else:
+            # One shared copy of the letterhead and of the stream that draws it
+            form_ref = letterhead.add_to(writer)
+            draw_letterhead = DecodedStreamObject()
+            draw_letterhead.set_data(f"q {LETTERHEAD_XOBJECT} Do Q\n".encode("ascii"))
+            draw_ref = writer._add_object(draw_letterhead)
+            
+            for overlay_page in overlay_reader.pages:
+                page = writer.add_page(overlay_page)
                 
-                # Merge overlay onto template
-                template_page.merge_page(overlay_page)
-                writer.add_page(template_page)
-            else:
-                # If no template, just use overlay
-                writer.add_page(overlay_reader.pages[page_num])
+                # Register the letterhead in the page resources
+                resources = page.setdefault(NameObject("/Resources"), DictionaryObject()).get_object()
+                xobjects = resources.setdefault(NameObject("/XObject"), DictionaryObject()).get_object()
+                xobjects[NameObject(LETTERHEAD_XOBJECT)] = form_ref
+                
+                # Draw the letterhead underneath the overlay content
+                contents = page.get(NameObject("/Contents"))
+                if contents is None:
+                    page_contents = [draw_ref]
+                elif isinstance(contents.get_object(), ArrayObject):
+                    page_contents = [draw_ref, *contents.get_object()]
+                else:
+                    page_contents = [draw_ref, contents]
+                page[NameObject("/Contents")] = ArrayObject(page_contents)
         
         # Write the merged PDF
         output_buffer = io.BytesIO()
@@ -357,6 +555,76 @@ def generate_financial_pdf_report(financial_data: dict) -> bytes:
     return merge_with_template(overlay_pdf_bytes, is_financial=True)
 
 
+def render_reception_pages(rows: list, report_info: dict, heading: bool) -> list:
+    """Render a page-aligned slice of an operational report to page content streams (runs in a worker process)"""
+    c = PdfPageCanvas(A4)
+    for _ in draw_reception_report(c, rows, report_info, heading=heading):
+        pass
+    c.save()
+    return c.pages
+
+
+def render_reception_report_parallel(receptions: list, report_info: dict, process_pool, workers: int) -> bytes:
+    """
+    Render an operational report with its pages split across a process pool.
+    
+    Rows are cut into chunks that start on page boundaries, so each worker
+    draws whole pages (table headers included) exactly as the sequential
+    layout would; the pages are then written in order under the letterhead.
+    """
+    rows = [ReportRow(*(getattr(reception, field) for field in ReportRow._fields)) for reception in receptions]
+    report_info = {'total_records': len(rows), **report_info}
+    
+    first_page_rows = reception_rows_per_page(report_info, first_page=True)
+    page_rows = reception_rows_per_page(report_info, first_page=False)
+    total_pages = 1 + -(-max(0, len(rows) - first_page_rows) // page_rows)
+    
+    # A few chunks per worker keeps them evenly loaded
+    pages_per_chunk = max(1, -(-total_pages // (workers * 4)))
+    chunks = [(rows[:first_page_rows + page_rows * (pages_per_chunk - 1)], True)]
+    start = len(chunks[0][0])
+    while start < len(rows):
+        end = start + page_rows * pages_per_chunk
+        chunks.append((rows[start:end], False))
+        start = end
+    
+    try:
+        letterhead = get_letterhead()
+    except Exception as e:
+        print(f"❌ Error loading template: {str(e)}")
+        letterhead = None
+    
+    c = StreamingPdfCanvas(A4, letterhead=letterhead, letterhead_name=LETTERHEAD_XOBJECT)
+    output = [c.take()]
+    
+    # map() yields results in submission order, so pages stay in order
+    for pages in process_pool.map(
+        render_reception_pages,
+        [chunk for chunk, _ in chunks],
+        [report_info] * len(chunks),
+        [heading for _, heading in chunks]
+    ):
+        for page in pages:
+            c.add_page(page)
+        output.append(c.take())
+    
+    c.save()
+    output.append(c.take())
+    return b"".join(output)
+
+
+def render_reception_report(receptions: list, report_info: dict) -> bytes:
+    """Render an operational report PDF, page-parallel across processes for large reports when enabled"""
+    process_pool = get_render_process_pool()
+    if process_pool is not None and len(receptions) >= settings.report_parallel_min_rows:
+        try:
+            return render_reception_report_parallel(receptions, report_info, process_pool, settings.report_render_processes)
+        except BrokenProcessPool as e:
+            print(f"❌ Report render process pool failed, rendering in-process: {str(e)}")
+            reset_render_process_pool()
+    return generate_pdf_report(receptions, report_info)
+
+
 def generate_pdf_report(receptions: list, report_info: dict) -> bytes:
     """Generate PDF report using template"""
     
@@ -367,26 +635,101 @@ def generate_pdf_report(receptions: list, report_info: dict) -> bytes:
     return merge_with_template(overlay_pdf_bytes, is_financial=False)
 
 
-@router.post("/generate")
-async def generate_report(
-    report_request: schemas.ReportRequest,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_admin_or_above)
-):
-    """Generate and return PDF report"""
+def summarize_rollups(query, dialect_name: str) -> tuple:
+    """
+    Aggregate a filtered daily rollup query into totals plus per-company and
+    per-water-type breakdowns without loading the rows.
+    
+    PostgreSQL computes all three groupings in one GROUPING SETS scan. Other
+    backends group by (company, water type) once and roll the cells up here,
+    which is bounded by the number of distinct pairs rather than rows.
+    
+    Returns:
+        tuple: (totals, company_stats, water_type_stats), each stats dict maps
+        a name to {"receptions", "vehicles", "quantity"}
+    """
+    rollup = models.DailyReceptionRollup
+    company = rollup.company_name
+    water_type = rollup.water_type
+    measures = (
+        func.coalesce(func.sum(rollup.reception_count), 0),
+        func.coalesce(func.sum(rollup.vehicle_count), 0),
+        func.coalesce(func.sum(rollup.total_quantity), 0.0)
+    )
     
-    # Parse dates
+    def as_stats(receptions, vehicles, quantity):
+        return {"receptions": receptions, "vehicles": vehicles, "quantity": quantity}
+    
+    totals = as_stats(0, 0, 0.0)
+    company_stats = {}
+    water_type_stats = {}
+    
+    if dialect_name == "postgresql":
+        rows = query.with_entities(
+            func.grouping(company), func.grouping(water_type), company, water_type, *measures
+        ).group_by(func.grouping_sets(tuple_(company), tuple_(water_type), tuple_())).all()
+        
+        for company_grouped, water_type_grouped, company_name, water_type_name, *values in rows:
+            if company_grouped and water_type_grouped:
+                totals = as_stats(*values)
+            elif water_type_grouped:
+                company_stats[company_name] = as_stats(*values)
+            else:
+                water_type_stats[water_type_name] = as_stats(*values)
+        
+        return totals, company_stats, water_type_stats
+    
+    rows = query.with_entities(company, water_type, *measures).group_by(company, water_type).all()
+    
+    for company_name, water_type_name, *values in rows:
+        for stats in (totals, company_stats.setdefault(company_name, as_stats(0, 0, 0.0)),
+                      water_type_stats.setdefault(water_type_name, as_stats(0, 0, 0.0))):
+            stats["receptions"] += values[0]
+            stats["vehicles"] += values[1]
+            stats["quantity"] += values[2]
+    
+    return totals, company_stats, water_type_stats
+
+
+def bucket_start(day_column, bucket: str, dialect_name: str):
+    """SQL expression truncating a date column to the start of its day/week/month bucket (weeks start Monday)"""
+    if dialect_name == "postgresql":
+        # Inline the (validated) unit so SELECT and GROUP BY render the same expression
+        return cast(func.date_trunc(literal_column(f"'{bucket}'"), cast(day_column, DateTime)), Date)
+    
+    if bucket == "week":
+        return func.date(day_column, "weekday 0", "-6 days")
+    if bucket == "month":
+        return func.strftime("%Y-%m-01", day_column)
+    return func.date(day_column)
+
+
+def parse_report_period(start_date: str, end_date: str) -> tuple:
+    """Parse a report's YYYY-MM-DD start/end dates, raising 400 on bad input"""
     try:
-        start_dt = datetime.strptime(report_request.start_date, '%Y-%m-%d')
-        end_dt = datetime.strptime(report_request.end_date, '%Y-%m-%d')
+        return datetime.strptime(start_date, '%Y-%m-%d'), datetime.strptime(end_date, '%Y-%m-%d')
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid date format. Use YYYY-MM-DD"
         )
-    
-    # Build query
-    query = db.query(models.VehicleReception).filter(
+
+
+def report_filename(report_request: schemas.ReportRequest, extension: str = "pdf") -> str:
+    """Download filename for an operational report"""
+    start_dt, end_dt = parse_report_period(report_request.start_date, report_request.end_date)
+    return f"vehicle_reception_report_{report_request.report_type}_{start_dt.strftime('%Y%m%d')}_{end_dt.strftime('%Y%m%d')}.{extension}"
+
+
+def financial_report_filename(report_request: schemas.FinancialReportRequest, extension: str = "pdf") -> str:
+    """Download filename for a financial report"""
+    start_dt, end_dt = parse_report_period(report_request.start_date, report_request.end_date)
+    return f"financial_report_{start_dt.strftime('%Y%m%d')}_{end_dt.strftime('%Y%m%d')}.{extension}"
+
+
+def filter_report_receptions(query, report_request: schemas.ReportRequest, start_dt: datetime, end_dt: datetime):
+    """Apply an operational report's period and filters to a reception query"""
+    query = query.filter(
         models.VehicleReception.is_active == True,
         models.VehicleReception.date >= start_dt,
         models.VehicleReception.date <= end_dt
@@ -395,14 +738,74 @@ async def generate_report(
     # Apply filters
     if report_request.company_filter:
         query = query.filter(
-            models.VehicleReception.company_name.ilike(f"%{report_request.company_filter}%")
+            models.VehicleReception.company_id.in_(company_ids_matching(report_request.company_filter))
         )
     
     if report_request.water_type_filter:
         query = query.filter(
-            models.VehicleReception.water_type.ilike(f"%{report_request.water_type_filter}%")
+            models.VehicleReception.waste_type_id.in_(waste_type_ids_matching(report_request.water_type_filter))
         )
     
+    return query
+
+
+def rollup_period(start_dt: datetime, end_dt: datetime) -> tuple:
+    """Daily rollup conditions for the days of a report period that have receptions"""
+    rollup = models.DailyReceptionRollup
+    return (
+        rollup.reception_count > 0,
+        rollup.day >= start_dt.date(),
+        rollup.day <= end_dt.date()
+    )
+
+
+def filter_rollup_names(query, start_dt: datetime, end_dt: datetime,
+                        company_names: Optional[list] = None, water_type_names: Optional[list] = None):
+    """Apply a report period and company/water type names (as stored in the rollup) to a daily rollup query"""
+    rollup = models.DailyReceptionRollup
+    query = query.filter(*rollup_period(start_dt, end_dt))
+    
+    if company_names is not None:
+        query = query.filter(rollup.company_name.in_(company_names))
+    
+    if water_type_names is not None:
+        query = query.filter(rollup.water_type.in_(water_type_names))
+    
+    return query
+
+
+def filter_report_rollups(query, db: Session, start_dt: datetime, end_dt: datetime,
+                          company_filter: Optional[str], water_type_filter: Optional[str]):
+    """Apply a report period and company/water type filters to a daily rollup query
+    
+    The rollup is keyed by the names as entered, so a filter keeps every name
+    whose company or waste type has any name or alias containing the text,
+    matching the same receptions as filter_report_receptions.
+    """
+    rollup = models.DailyReceptionRollup
+    in_period = rollup_period(start_dt, end_dt)
+    company_names = water_type_names = None
+    
+    # Apply filters
+    if company_filter:
+        names = [name for name, in db.query(rollup.company_name).filter(*in_period).distinct()]
+        company_names = company_names_matching(db, names, company_filter)
+    
+    if water_type_filter:
+        names = [name for name, in db.query(rollup.water_type).filter(*in_period).distinct()]
+        water_type_names = waste_type_names_matching(db, names, water_type_filter)
+    
+    return filter_rollup_names(query, start_dt, end_dt, company_names, water_type_names)
+
+
+def load_report_data(db: Session, report_request: schemas.ReportRequest) -> tuple:
+    """Query the receptions and summary info for an operational report"""
+    
+    # Parse dates
+    start_dt, end_dt = parse_report_period(report_request.start_date, report_request.end_date)
+    
+    query = filter_report_receptions(db.query(models.VehicleReception), report_request, start_dt, end_dt)
+    
     # Get data
     receptions = query.order_by(models.VehicleReception.date).all()
     
@@ -419,16 +822,446 @@ async def generate_report(
         'total_quantity': total_quantity
     }
     
-    # Generate PDF
-    pdf_content = generate_pdf_report(receptions, report_info)
-    
-    # Generate filename
-    filename = f"vehicle_reception_report_{report_request.report_type}_{start_dt.strftime('%Y%m%d')}_{end_dt.strftime('%Y%m%d')}.pdf"
+    return receptions, report_info
+
+
+def load_report_totals(db: Session, report_request: schemas.ReportRequest, start_dt: datetime, end_dt: datetime) -> dict:
+    """
+    Report info for a streamed operational report.
+    
+    Header totals come from one aggregate query so rows never need to be held.
+    """
+    total_records, total_vehicles, total_quantity = filter_report_receptions(
+        db.query(
+            func.count(models.VehicleReception.id),
+            func.coalesce(func.sum(models.VehicleReception.number_of_vehicles), 0),
+            func.coalesce(func.sum(models.VehicleReception.total_quantity), 0.0)
+        ),
+        report_request, start_dt, end_dt
+    ).one()
     
+    return {
+        'type': report_request.report_type,
+        'start_date': start_dt,
+        'end_date': end_dt,
+        'total_records': total_records,
+        'total_vehicles': total_vehicles,
+        'total_quantity': total_quantity
+    }
+
+
+def normalized_report_params(report_request) -> dict:
+    """Report request parameters with filters normalised, for cache and job keys"""
+    params = report_request.dict()
+    for field in ("company_filter", "water_type_filter"):
+        if field in params:
+            params[field] = normalize_filter(params[field])
+    return params
+
+
+def report_data_stamp(db: Session, start_dt: datetime, end_dt: datetime) -> str:
+    """
+    Version stamp of the receptions in a report period.
+
+    Covers inactive rows too, so inserts, edits and soft deletes in the
+    period all change the stamp (and so the cache key of its reports), while
+    writes outside the period leave it alone. The revision total catches
+    edits within the same second as the last one. Runs through the whole end
+    day, which financial reports include.
+    """
+    count, max_id, max_updated_at, revisions = db.query(
+        func.count(models.VehicleReception.id),
+        func.max(models.VehicleReception.id),
+        func.max(models.VehicleReception.updated_at),
+        func.coalesce(func.sum(models.VehicleReception.revision), 0)
+    ).filter(
+        models.VehicleReception.date >= start_dt,
+        models.VehicleReception.date < end_dt + timedelta(days=1)
+    ).one()
+    return f"{count}:{max_id}:{max_updated_at}:{revisions}"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header matches etag"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def pdf_response(pdf_content: bytes, filename: str, etag: str) -> Response:
+    """PDF download response carrying the report's cache ETag"""
     return Response(
         content=pdf_content,
         media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "ETag": etag,
+            "Cache-Control": "private, no-cache"
+        }
+    )
+
+
+def xlsx_headers(filename: str, etag: str) -> dict:
+    """Response headers for an XLSX report download"""
+    return {
+        "Content-Disposition": f"attachment; filename={filename}",
+        "ETag": etag,
+        "Cache-Control": "private, no-cache"
+    }
+
+
+def stream_report_xlsx(report_request: schemas.ReportRequest, report_info: dict, slot):
+    """
+    Yield an operational report as an XLSX workbook.
+    
+    Same columns and header totals as the PDF, plus a TOTAL row. Rows come
+    from a server-side cursor and the sheet is flushed every batch, so memory
+    stays flat however long the period. Frees the render slot when done.
+    """
+    db = SessionLocal()
+    try:
+        sheet = XlsxStreamWriter("Receptions", column_widths=[12, 28, 10, 28, 14, 10, 10])
+        sheet.write_row([f"Vehicle Reception Report - {report_info['type'].title()}"], [STYLE_BOLD])
+        sheet.write_row(["Report Period", report_info['start_date'], report_info['end_date']])
+        sheet.write_row(["Generated On", datetime.now().strftime('%Y-%m-%d %H:%M')])
+        sheet.write_row(["Total Records", report_info['total_records']])
+        sheet.write_row(["Total Vehicles", report_info['total_vehicles']])
+        sheet.write_row(["Total Quantity (m³)", report_info['total_quantity']], [0, STYLE_NUMBER])
+        sheet.write_row([])
+        
+        headers = ['Date', 'Company', 'Vehicles', 'Water Type', 'Quantity (m³)', 'Arrival', 'Departure']
+        sheet.write_row(headers, [STYLE_BOLD] * len(headers))
+        yield sheet.take()
+        
+        rows = filter_report_receptions(
+            db.query(*REPORT_ROW_COLUMNS), report_request, report_info['start_date'], report_info['end_date']
+        ).order_by(models.VehicleReception.date).yield_per(REPORT_STREAM_BATCH_SIZE)
+        
+        row_styles = [0, 0, 0, 0, STYLE_NUMBER, 0, 0]
+        for count, reception in enumerate(rows, start=1):
+            sheet.write_row([
+                reception.date.date(),
+                clean_text_for_pdf(translate_to_english(reception.company_name)),
+                reception.number_of_vehicles,
+                clean_text_for_pdf(translate_to_english(reception.water_type)),
+                reception.total_quantity,
+                reception.arrival_time.time() if reception.arrival_time else '-',
+                reception.departure_time.time() if reception.departure_time else '-'
+            ], row_styles)
+            if count % REPORT_STREAM_BATCH_SIZE == 0:
+                yield sheet.take()
+        
+        sheet.write_row(
+            ['TOTAL', None, report_info['total_vehicles'], None, report_info['total_quantity']],
+            [STYLE_BOLD, 0, STYLE_BOLD, 0, STYLE_BOLD_NUMBER]
+        )
+        sheet.close()
+        yield sheet.take()
+    finally:
+        db.close()
+        slot.release()
+
+
+def stream_financial_xlsx(financial_data: dict, slot):
+    """
+    Yield a financial report as an XLSX workbook.
+    
+    Same columns as the PDF with the currency in its own column, and totals
+    per currency instead of a single mixed-currency cost. Frees the render
+    slot when done.
+    """
+    try:
+        companies = financial_data['companies']
+        currency_totals = financial_data['currency_totals']
+        
+        sheet = XlsxStreamWriter("Financial Summary", column_widths=[28, 24, 14, 10, 14, 16, 12])
+        sheet.write_row(["Financial Cost Summary Report"], [STYLE_BOLD])
+        sheet.write_row(["Report Period", financial_data['period_start'], financial_data['period_end']])
+        sheet.write_row(["Generated On", financial_data['generated_at'].strftime('%Y-%m-%d %H:%M:%S')])
+        sheet.write_row(["Total Companies", len({line['company_name'] for line in companies})])
+        sheet.write_row(["Total Volume (m³)", financial_data['total_volume_m3']], [0, STYLE_NUMBER])
+        for total in currency_totals:
+            sheet.write_row([f"Total Cost ({total['currency']})", total['total_cost']], [0, STYLE_NUMBER])
+        converted = financial_data.get('converted_total')
+        if converted:
+            sheet.write_row([f"Total Cost (all in {converted['currency']})", converted['total_cost']], [0, STYLE_NUMBER])
+            sheet.write_row(
+                ["EGP per USD", converted['egp_per_usd'], converted['exchange_rate_day'].strftime('%Y-%m-%d')],
+                [0, STYLE_NUMBER, 0]
+            )
+        sheet.write_row([])
+        
+        headers = ['Company Name', 'Waste Type', 'Volume (m³)', 'Currency', 'Rate per m³', 'Total Cost', 'Receptions']
+        sheet.write_row(headers, [STYLE_BOLD] * len(headers))
+        
+        row_styles = [0, 0, STYLE_NUMBER, 0, STYLE_NUMBER, STYLE_NUMBER, 0]
+        for company_data in companies:
+            sheet.write_row([
+                financial_line_company(company_data),
+                financial_line_waste_type(company_data),
+                company_data['total_volume_m3'],
+                company_data['currency'],
+                company_data['rate_per_m3'],
+                company_data['total_cost'],
+                company_data['reception_count']
+            ], row_styles)
+        
+        total_styles = [STYLE_BOLD, 0, STYLE_BOLD_NUMBER, STYLE_BOLD, 0, STYLE_BOLD_NUMBER, STYLE_BOLD]
+        for total in currency_totals:
+            sheet.write_row(
+                [f"TOTAL ({total['currency']})", None, total['total_volume_m3'], total['currency'], None,
+                 total['total_cost'], total['reception_count']],
+                total_styles
+            )
+        sheet.write_row(
+            ['TOTAL', None, financial_data['total_volume_m3'], converted and converted['currency'], None,
+             converted and converted['total_cost'], sum(total['reception_count'] for total in currency_totals)],
+            total_styles
+        )
+        
+        sheet.close()
+        yield sheet.take()
+    finally:
+        slot.release()
+
+
+@router.post("/generate")
+async def generate_report(
+    report_request: schemas.ReportRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_admin_or_above),
+    if_none_match: Optional[str] = Header(None),
+    output_format: str = Query("pdf", alias="format", pattern="^(pdf|xlsx)$")
+):
+    """
+    Generate and return PDF report (served from the PDF cache when the data is unchanged).
+    
+    With format=xlsx the same report is streamed as an Excel workbook instead.
+    """
+    
+    start_dt, end_dt = parse_report_period(report_request.start_date, report_request.end_date)
+    filename = report_filename(report_request, output_format)
+    
+    kind = "report" if output_format == "pdf" else "report-xlsx"
+    key = pdf_cache_key(kind, normalized_report_params(report_request), report_data_stamp(db, start_dt, end_dt))
+    etag = f'"{key}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    if output_format == "xlsx":
+        report_info = load_report_totals(db, report_request, start_dt, end_dt)
+        slot = render_pool.reserve()
+        return StreamingResponse(
+            stream_report_xlsx(report_request, report_info, slot),
+            media_type=XLSX_MEDIA_TYPE,
+            headers=xlsx_headers(filename, etag),
+            background=BackgroundTask(slot.release)
+        )
+    
+    pdf_content = pdf_cache.get(key)
+    if pdf_content is None:
+        receptions, report_info = load_report_data(db, report_request)
+        
+        # Generate PDF off the event loop
+        pdf_content = await render_pool.run(render_reception_report, receptions, report_info)
+        pdf_cache.set(key, pdf_content)
+    
+    return pdf_response(pdf_content, filename, etag)
+
+
+def stream_report_pdf(report_request: schemas.ReportRequest, report_info: dict, slot):
+    """
+    Yield an operational report PDF page by page.
+    
+    Rows are read through a server-side cursor in batches and each page is
+    written out as soon as it is drawn, so memory stays flat however long the
+    period. Runs in Starlette's threadpool with its own session, and frees
+    the render slot when done.
+    """
+    db = SessionLocal()
+    try:
+        try:
+            letterhead = get_letterhead()
+        except Exception as e:
+            print(f"❌ Error loading template: {str(e)}")
+            letterhead = None
+        
+        c = StreamingPdfCanvas(A4, letterhead=letterhead, letterhead_name=LETTERHEAD_XOBJECT)
+        rows = filter_report_receptions(
+            db.query(*REPORT_ROW_COLUMNS), report_request, report_info['start_date'], report_info['end_date']
+        ).order_by(models.VehicleReception.date).yield_per(REPORT_STREAM_BATCH_SIZE)
+        
+        for _ in draw_reception_report(c, rows, report_info):
+            yield c.take()
+        
+        c.save()
+        yield c.take()
+    finally:
+        db.close()
+        slot.release()
+
+
+@router.post("/generate/stream")
+async def generate_report_stream(
+    report_request: schemas.ReportRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_admin_or_above),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Generate a PDF report for a very large period, streamed page by page in bounded memory"""
+    
+    start_dt, end_dt = parse_report_period(report_request.start_date, report_request.end_date)
+    filename = report_filename(report_request)
+    
+    key = pdf_cache_key("report-stream", normalized_report_params(report_request), report_data_stamp(db, start_dt, end_dt))
+    etag = f'"{key}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    report_info = load_report_totals(db, report_request, start_dt, end_dt)
+    
+    # Count the stream against the render pool's concurrency limit
+    slot = render_pool.reserve()
+    
+    return StreamingResponse(
+        stream_report_pdf(report_request, report_info, slot),
+        media_type="application/pdf",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "ETag": etag,
+            "Cache-Control": "private, no-cache"
+        },
+        # Also frees the slot if the stream never started
+        background=BackgroundTask(slot.release)
+    )
+
+
+def company_report_filename(report_request: schemas.ReportBatchRequest, company_name: str) -> str:
+    """Archive entry name for one company's report in a batch"""
+    start_dt, end_dt = parse_report_period(report_request.start_date, report_request.end_date)
+    company = re.sub(r'[\\/:*?"<>|]+', "_", translate_to_english(company_name)).strip() or "company"
+    return f"{company}/vehicle_reception_report_{report_request.report_type}_{start_dt.strftime('%Y%m%d')}_{end_dt.strftime('%Y%m%d')}.pdf"
+
+
+def stream_company_reports_zip(company_rows: dict, report_request: schemas.ReportBatchRequest, report_info: dict, slot):
+    """
+    Yield a ZIP archive of per-company report PDFs, adding each file as it completes.
+    
+    Reports render in parallel on the batch process pool; only on a single
+    CPU, or for the reports left when the pool breaks, do they render one
+    after another on this thread. Frees the render slot when done.
+    """
+    def company_info(rows):
+        return {
+            **report_info,
+            'total_records': len(rows),
+            'total_vehicles': sum(row.number_of_vehicles for row in rows),
+            'total_quantity': sum(row.total_quantity for row in rows)
+        }
+    
+    def rendered():
+        pending = dict(company_rows)
+        process_pool = get_batch_process_pool() if len(company_rows) > 1 else None
+        if process_pool is not None:
+            try:
+                futures = {
+                    process_pool.submit(generate_pdf_report, rows, company_info(rows)): company_name
+                    for company_name, rows in company_rows.items()
+                }
+                try:
+                    for future in as_completed(futures):
+                        company_name = futures[future]
+                        pdf_content = future.result()
+                        del pending[company_name]
+                        yield company_name, pdf_content
+                finally:
+                    for future in futures:
+                        future.cancel()
+            except BrokenProcessPool as e:
+                print(f"❌ Batch render process pool failed, rendering the remaining reports in-process: {str(e)}")
+                reset_batch_process_pool()
+        
+        for company_name, rows in pending.items():
+            yield company_name, generate_pdf_report(rows, company_info(rows))
+    
+    buffer = ZipStreamBuffer()
+    try:
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for company_name, pdf_content in rendered():
+                archive.writestr(company_report_filename(report_request, company_name), pdf_content)
+                yield buffer.take()
+        yield buffer.take()
+    finally:
+        slot.release()
+
+
+@router.post("/batch")
+async def generate_report_batch(
+    report_request: schemas.ReportBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_admin_or_above)
+):
+    """Generate one PDF report per company for a period, streamed back as a ZIP archive"""
+    
+    start_dt, end_dt = parse_report_period(report_request.start_date, report_request.end_date)
+    
+    # One range query for every company, partitioned in memory by company id
+    query = filter_report_receptions(
+        db.query(*REPORT_ROW_COLUMNS, models.VehicleReception.company_id),
+        schemas.ReportRequest(
+            start_date=report_request.start_date,
+            end_date=report_request.end_date,
+            report_type=report_request.report_type,
+            water_type_filter=report_request.water_type_filter
+        ),
+        start_dt, end_dt
+    )
+    if report_request.companies != "all":
+        if not report_request.companies:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Provide at least one company or "all"'
+            )
+        
+        # Any name or alias of a company selects all of its receptions; the
+        # report is filed under the first name given for it
+        company_names = {}
+        unknown_names = []
+        for company_name in report_request.companies:
+            company_id = find_company(db, company_name)
+            if company_id is None:
+                unknown_names.append(company_name)
+            else:
+                company_names.setdefault(company_id, company_name)
+        query = query.filter(models.VehicleReception.company_id.in_(list(company_names)))
+        
+        # Requested companies get a report even when they have no receptions
+        company_rows = {company_name: [] for company_name in [*company_names.values(), *unknown_names]}
+    else:
+        company_names = dict(db.query(models.Company.id, models.Company.name))
+        company_rows = {}
+    
+    for *row, company_id in query.order_by(models.VehicleReception.date).yield_per(REPORT_STREAM_BATCH_SIZE):
+        row = ReportRow(*row)
+        company_rows.setdefault(company_names.get(company_id, row.company_name), []).append(row)
+    
+    report_info = {
+        'type': report_request.report_type,
+        'start_date': start_dt,
+        'end_date': end_dt
+    }
+    
+    # Count the batch against the render pool's concurrency limit
+    slot = render_pool.reserve()
+    
+    filename = f"vehicle_reception_reports_{report_request.report_type}_{start_dt.strftime('%Y%m%d')}_{end_dt.strftime('%Y%m%d')}.zip"
+    return StreamingResponse(
+        stream_company_reports_zip(company_rows, report_request, report_info, slot),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+        # Also frees the slot if the stream never started
+        background=BackgroundTask(slot.release)
     )
 
 
@@ -453,27 +1286,28 @@ async def get_report_summary(
             detail="Invalid date format. Use YYYY-MM-DD"
         )
     
-    # Build query
-    query = db.query(models.VehicleReception).filter(
-        models.VehicleReception.is_active == True,
-        models.VehicleReception.date >= start_dt,
-        models.VehicleReception.date <= end_dt
+    cache_key = (
+        "reports.summary", start_dt.date(), end_dt.date(),
+        normalize_filter(company_filter), normalize_filter(water_type_filter)
     )
     
-    # Apply filters
-    if company_filter:
-        query = query.filter(
-            models.VehicleReception.company_name.ilike(f"%{company_filter}%")
+    def build():
+        # Query over the daily rollup (one row per day/company/water type)
+        query = filter_report_rollups(
+            db.query(models.DailyReceptionRollup), db, start_dt, end_dt, company_filter, water_type_filter
         )
+        return build_report_summary(query, db.get_bind().dialect.name, start_dt, end_dt)
     
-    if water_type_filter:
-        query = query.filter(
-            models.VehicleReception.water_type.ilike(f"%{water_type_filter}%")
-        )
+    return summary_cache.get_or_set(cache_key, build)
+
+
+def build_report_summary(query, dialect_name: str, start_dt: datetime, end_dt: datetime) -> dict:
+    """Build the /reports/summary response from a filtered daily rollup query"""
     
-    receptions = query.all()
+    # Grouped aggregation in the database
+    totals, company_stats, water_type_stats = summarize_rollups(query, dialect_name)
     
-    if not receptions:
+    if not totals["receptions"]:
         return {
             "total_receptions": 0,
             "total_vehicles": 0,
@@ -485,39 +1319,15 @@ async def get_report_summary(
         }
     
     # Calculate statistics
-    total_receptions = len(receptions)
-    total_vehicles = sum(r.number_of_vehicles for r in receptions)
-    total_quantity = sum(r.total_quantity for r in receptions)
+    total_receptions = totals["receptions"]
+    total_vehicles = totals["vehicles"]
+    total_quantity = totals["quantity"]
     
     # Calculate averages per day
     days_in_period = (end_dt - start_dt).days + 1
     average_vehicles_per_day = total_vehicles / days_in_period if days_in_period > 0 else 0
     average_quantity_per_day = total_quantity / days_in_period if days_in_period > 0 else 0
     
-    # Get unique values
-    companies = list(set(r.company_name for r in receptions))
-    water_types = list(set(r.water_type for r in receptions))
-    
-    # Company breakdown
-    company_stats = {}
-    for company in companies:
-        company_receptions = [r for r in receptions if r.company_name == company]
-        company_stats[company] = {
-            "receptions": len(company_receptions),
-            "vehicles": sum(r.number_of_vehicles for r in company_receptions),
-            "quantity": sum(r.total_quantity for r in company_receptions)
-        }
-    
-    # Water type breakdown
-    water_type_stats = {}
-    for water_type in water_types:
-        water_type_receptions = [r for r in receptions if r.water_type == water_type]
-        water_type_stats[water_type] = {
-            "receptions": len(water_type_receptions),
-            "vehicles": sum(r.number_of_vehicles for r in water_type_receptions),
-            "quantity": sum(r.total_quantity for r in water_type_receptions)
-        }
-    
     return {
         "period": {
             "start_date": start_dt.isoformat(),
@@ -540,113 +1350,138 @@ async def get_report_summary(
     }
 
 
-@router.post("/financial/generate")
-async def generate_financial_report(
-    report_request: schemas.FinancialReportRequest,
+@router.get("/series")
+async def get_report_series(
+    start_date: str,
+    end_date: str,
+    bucket: str = Query("day", pattern="^(day|week|month)$"),
+    split_by: Optional[str] = Query(None, pattern="^(company|water_type)$"),
+    company_filter: Optional[str] = None,
+    water_type_filter: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_super_admin)
+    current_user: models.User = Depends(require_admin_or_above)
 ):
-    """Generate and return financial PDF report with cost calculations"""
+    """Get receptions, vehicles and quantity per day/week/month bucket in one grouped query"""
     
     # Parse dates
     try:
-        start_dt = datetime.strptime(report_request.start_date, '%Y-%m-%d')
-        end_dt = datetime.strptime(report_request.end_date, '%Y-%m-%d')
+        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+        end_dt = datetime.strptime(end_date, '%Y-%m-%d')
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid date format. Use YYYY-MM-DD"
         )
     
-    # Build query
-    query = db.query(models.VehicleReception).filter(
-        models.VehicleReception.is_active == True,
-        models.VehicleReception.date >= start_dt,
-        models.VehicleReception.date <= end_dt
+    rollup = models.DailyReceptionRollup
+    period_start = bucket_start(rollup.day, bucket, db.get_bind().dialect.name).label("bucket_start")
+    group_columns = [period_start]
+    if split_by == "company":
+        group_columns.append(rollup.company_name)
+    elif split_by == "water_type":
+        group_columns.append(rollup.water_type)
+    
+    # Build grouped query over the daily rollup
+    query = db.query(
+        *group_columns,
+        func.sum(rollup.reception_count),
+        func.sum(rollup.vehicle_count),
+        func.sum(rollup.total_quantity)
     )
+    query = filter_report_rollups(query, db, start_dt, end_dt, company_filter, water_type_filter)
     
-    # Apply company filter if provided
-    if report_request.company_filter:
-        query = query.filter(
-            models.VehicleReception.company_name.ilike(f"%{report_request.company_filter}%")
-        )
+    rows = query.group_by(*group_columns).order_by(*group_columns).all()
     
-    # Get data
-    receptions = query.order_by(models.VehicleReception.date).all()
+    points = []
+    for row in rows:
+        point = {"bucket_start": str(row[0])}
+        if split_by:
+            point["group"] = row[1]
+        receptions, vehicles, quantity = row[-3:]
+        point.update({"receptions": receptions, "vehicles": vehicles, "quantity": quantity})
+        points.append(point)
     
-    if not receptions:
-        # Return empty report if no data
-        financial_data = {
-            'period_start': start_dt.strftime('%Y-%m-%d'),
-            'period_end': end_dt.strftime('%Y-%m-%d'),
-            'companies': [],
-            'total_volume_m3': 0.0,
-            'total_cost': 0.0,
-            'generated_at': datetime.now()
-        }
-    else:
-        # Calculate financial data by company
-        company_data = {}
-        for reception in receptions:
-            company = reception.company_name
-            if company not in company_data:
-                company_data[company] = {
-                    'total_volume': 0.0,
-                    'reception_count': 0
-                }
-            company_data[company]['total_volume'] += reception.total_quantity
-            company_data[company]['reception_count'] += 1
-        
-        # Build company financial summaries
-        companies = []
-        total_volume = 0.0
-        total_cost = 0.0
-        
-        for company_name, data in company_data.items():
-            volume = data['total_volume']
-            
-            # Get rate information with currency
-            rate_info = get_company_rate(company_name)
-            rate_value = rate_info['rate']
-            currency = rate_info['currency']
-            
-            # Calculate cost
-            cost = volume * rate_value
-            total_volume += volume
-            total_cost += cost  # Note: mixing currencies - should be handled in display
-            
-            companies.append({
-                'company_name': company_name,
-                'total_volume_m3': volume,
-                'rate_per_m3': rate_value,
-                'currency': currency,
-                'total_cost': cost,
-                'reception_count': data['reception_count']
-            })
-        
-        # Sort companies by total cost (descending)
-        companies.sort(key=lambda x: x['total_cost'], reverse=True)
-        
-        financial_data = {
-            'period_start': start_dt.strftime('%Y-%m-%d'),
-            'period_end': end_dt.strftime('%Y-%m-%d'),
-            'companies': companies,
-            'total_volume_m3': total_volume,
-            'total_cost': total_cost,
-            'generated_at': datetime.now()
-        }
+    return {
+        "period": {
+            "start_date": start_dt.isoformat(),
+            "end_date": end_dt.isoformat()
+        },
+        "bucket": bucket,
+        "split_by": split_by,
+        "points": points
+    }
+
+
+def load_financial_data(db: Session, report_request: schemas.FinancialReportRequest) -> dict:
+    """Aggregate and price a financial report's period (grouped by company, waste type and currency)"""
     
-    # Generate PDF
-    pdf_content = generate_financial_pdf_report(financial_data)
+    # Parse dates
+    start_dt, end_dt = parse_report_period(report_request.start_date, report_request.end_date)
     
-    # Generate filename
-    filename = f"financial_report_{start_dt.strftime('%Y%m%d')}_{end_dt.strftime('%Y%m%d')}.pdf"
+    try:
+        financial_data = load_financials(
+            db, start_dt, end_dt, report_request.company_filter, report_request.convert_to
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    financial_data.update({
+        'period_start': start_dt.strftime('%Y-%m-%d'),
+        'period_end': end_dt.strftime('%Y-%m-%d'),
+        'generated_at': datetime.now()
+    })
     
-    return Response(
-        content=pdf_content,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    return financial_data
+
+
+@router.post("/financial/generate")
+async def generate_financial_report(
+    report_request: schemas.FinancialReportRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_super_admin),
+    if_none_match: Optional[str] = Header(None),
+    output_format: str = Query("pdf", alias="format", pattern="^(pdf|xlsx)$")
+):
+    """
+    Generate and return financial PDF report with cost calculations (served from the PDF cache when the data is unchanged).
+    
+    With format=xlsx the same figures are streamed as an Excel workbook instead.
+    """
+    
+    start_dt, end_dt = parse_report_period(report_request.start_date, report_request.end_date)
+    filename = financial_report_filename(report_request, output_format)
+    
+    kind = "financial" if output_format == "pdf" else "financial-xlsx"
+    data_stamp = (
+        f"{report_data_stamp(db, start_dt, end_dt)}:rates={get_rate_index(db).version}"
+        f":exchange={get_exchange_rate_index(db).version}"
     )
+    key = pdf_cache_key(kind, normalized_report_params(report_request), data_stamp)
+    etag = f'"{key}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    if output_format == "xlsx":
+        financial_data = load_financial_data(db, report_request)
+        slot = render_pool.reserve()
+        return StreamingResponse(
+            stream_financial_xlsx(financial_data, slot),
+            media_type=XLSX_MEDIA_TYPE,
+            headers=xlsx_headers(filename, etag),
+            background=BackgroundTask(slot.release)
+        )
+    
+    pdf_content = pdf_cache.get(key)
+    if pdf_content is None:
+        financial_data = load_financial_data(db, report_request)
+        
+        # Generate PDF off the event loop
+        pdf_content = await render_pool.run(generate_financial_pdf_report, financial_data)
+        pdf_cache.set(key, pdf_content)
+    
+    return pdf_response(pdf_content, filename, etag)
 
 
 @router.get("/financial/summary")
@@ -654,10 +1489,11 @@ async def get_financial_summary(
     start_date: str,
     end_date: str,
     company_filter: Optional[str] = None,
+    convert_to: Optional[str] = Query(None, pattern="^(USD|EGP)$"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_super_admin)
 ):
-    """Get financial summary for the specified period"""
+    """Get financial summary for the specified period (with convert_to, also a grand total in that currency)"""
     
     # Parse dates
     try:
@@ -669,83 +1505,338 @@ async def get_financial_summary(
             detail="Invalid date format. Use YYYY-MM-DD"
         )
     
-    # Build query
-    query = db.query(models.VehicleReception).filter(
-        models.VehicleReception.is_active == True,
-        models.VehicleReception.date >= start_dt,
-        models.VehicleReception.date <= end_dt
+    # Rates are part of the key: another worker may have changed them
+    rate_versions = (get_rate_index(db).version, get_exchange_rate_index(db).version)
+    cache_key = (
+        "reports.financial_summary", start_dt.date(), end_dt.date(), normalize_filter(company_filter), convert_to,
+        rate_versions
     )
-    
-    # Apply company filter if provided
-    if company_filter:
-        query = query.filter(
-            models.VehicleReception.company_name.ilike(f"%{company_filter}%")
+    try:
+        return summary_cache.get_or_set(
+            cache_key,
+            lambda: build_financial_summary(db, start_dt, end_dt, company_filter, convert_to)
         )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+def build_financial_summary(db: Session, start_dt: datetime, end_dt: datetime, company_filter: Optional[str] = None,
+                            convert_to: Optional[str] = None) -> schemas.FinancialReportSummary:
+    """Build the financial summary response for a period"""
+    financial_data = load_financials(db, start_dt, end_dt, company_filter, convert_to)
+    
+    return schemas.FinancialReportSummary(
+        period_start=start_dt.strftime('%Y-%m-%d'),
+        period_end=end_dt.strftime('%Y-%m-%d'),
+        companies=[schemas.CompanyFinancialSummary(**line) for line in financial_data['companies']],
+        currency_totals=[schemas.CurrencyTotal(**total) for total in financial_data['currency_totals']],
+        total_volume_m3=financial_data['total_volume_m3'],
+        total_cost=financial_data['total_cost'],
+        converted_total=financial_data['converted_total'],
+        generated_at=datetime.now()
+    )
+
+
+@router.post("/financial/simulate", response_model=schemas.RateSimulationResult)
+async def simulate_financial_rates(
+    simulation: schemas.RateSimulationRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_super_admin)
+):
+    """
+    Compare what a period cost with what it would have cost under each
+    candidate rate table (up to 50 per request, evaluated together).
+    """
     
-    receptions = query.all()
+    start_dt, end_dt = parse_report_period(simulation.start_date, simulation.end_date)
     
-    if not receptions:
-        return schemas.FinancialReportSummary(
-            period_start=start_date,
-            period_end=end_date,
-            companies=[],
-            total_volume_m3=0.0,
-            total_cost=0.0,
-            generated_at=datetime.now()
+    try:
+        scenarios = [(scenario.name, scenario_rate_table(db, scenario.rates)) for scenario in simulation.scenarios]
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
     
-    # Calculate financial data by company
-    company_data = {}
-    for reception in receptions:
-        company = reception.company_name
-        if company not in company_data:
-            company_data[company] = {
-                'total_volume': 0.0,
-                'reception_count': 0
-            }
-        company_data[company]['total_volume'] += reception.total_quantity
-        company_data[company]['reception_count'] += 1
-    
-    # Build company financial summaries
-    companies = []
-    total_volume = 0.0
-    total_cost = 0.0
-    
-    for company_name, data in company_data.items():
-        volume = data['total_volume']
-        company_rate = get_company_rate(company_name)
-        cost = volume * company_rate
-        total_volume += volume
-        total_cost += cost
-        
-        companies.append(schemas.CompanyFinancialSummary(
-            company_name=company_name,
-            total_volume_m3=volume,
-            rate_per_m3=company_rate,
-            total_cost=cost,
-            reception_count=data['reception_count']
-        ))
+    result = simulate_rates(db, start_dt, end_dt, simulation.company_filter, scenarios)
+    
+    return schemas.RateSimulationResult(
+        period_start=start_dt.strftime('%Y-%m-%d'),
+        period_end=end_dt.strftime('%Y-%m-%d'),
+        generated_at=datetime.now(),
+        **result
+    )
+
+
+def report_job_key(kind: str, report_request) -> str:
+    """Normalised key under which identical in-flight report jobs are coalesced"""
+    return f"{kind}:{json.dumps(normalized_report_params(report_request), sort_keys=True)}"
+
+
+@router.post("/jobs", response_model=schemas.ReportJobStatus, status_code=status.HTTP_202_ACCEPTED)
+async def submit_report_job(
+    job_request: schemas.ReportJobCreate,
+    current_user: models.User = Depends(require_admin_or_above)
+):
+    """Queue a PDF report for background rendering; poll the job and download it when done"""
+    
+    if job_request.report is not None:
+        report_request = job_request.report
+        kind = "report"
+        filename = report_filename(report_request)
+        load = lambda db: load_report_data(db, report_request)
+        render = lambda data: render_reception_report(*data)
+    else:
+        if current_user.role != "super_admin":
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Super admin access required"
+            )
+        report_request = job_request.financial_report
+        kind = "financial"
+        filename = financial_report_filename(report_request)
+        load = lambda db: load_financial_data(db, report_request)
+        render = generate_financial_pdf_report
+    
+    return report_jobs.submit(
+        kind=kind,
+        key=report_job_key(kind, report_request),
+        filename=filename,
+        owner_id=current_user.id,
+        load=load,
+        render=render
+    )
+
+
+def get_report_job_or_404(job_id: str, current_user: models.User):
+    job = report_jobs.get(job_id, current_user)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Report job not found"
+        )
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.ReportJobStatus)
+async def get_report_job(
+    job_id: str,
+    current_user: models.User = Depends(require_admin_or_above)
+):
+    """Get the status and progress of a background report job"""
+    return get_report_job_or_404(job_id, current_user)
+
+
+@router.get("/jobs/{job_id}/download")
+async def download_report_job(
+    job_id: str,
+    current_user: models.User = Depends(require_admin_or_above)
+):
+    """Download the PDF produced by a finished report job"""
+    job = get_report_job_or_404(job_id, current_user)
     
-    # Sort companies by total cost (descending)
-    companies.sort(key=lambda x: x.total_cost, reverse=True)
+    if job.status == JOB_FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Report job failed: {job.error}"
+        )
+    if job.status != JOB_DONE or not job.path or not os.path.exists(job.path):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Report job is not finished yet"
+        )
     
-    return schemas.FinancialReportSummary(
-        period_start=start_date,
-        period_end=end_date,
-        companies=companies,
-        total_volume_m3=total_volume,
-        total_cost=total_cost,
-        generated_at=datetime.now()
+    return FileResponse(job.path, media_type="application/pdf", filename=job.filename)
+
+
+@router.get("/cache-stats")
+async def get_cache_stats(current_user: models.User = Depends(require_super_admin)):
+    """Get hit/miss counters for the summary and PDF caches and report render pool load"""
+    return {
+        **summary_cache.stats(),
+        "render_pool": render_pool.stats(),
+        "pdf_cache": pdf_cache.stats()
+    }
+
+
+def company_rate_versions(db: Session, rate_id: Optional[int] = None) -> list:
+    """Company rate versions with company and waste type names, current first within each rate"""
+    query = db.query(
+        models.CompanyRate.id,
+        models.Company.name,
+        models.Company.name_en,
+        models.WasteType.name.label("type"),
+        models.CompanyRate.currency,
+        models.CompanyRate.rate,
+        models.CompanyRate.effective_from,
+        models.CompanyRate.effective_to
+    ).join(
+        models.Company, models.Company.id == models.CompanyRate.company_id
+    ).outerjoin(
+        models.WasteType, models.WasteType.id == models.CompanyRate.waste_type_id
     )
+    if rate_id is not None:
+        query = query.filter(models.CompanyRate.id == rate_id)
+    rows = query.order_by(
+        models.Company.name, models.WasteType.name, models.CompanyRate.effective_from.desc()
+    ).all()
+    return [schemas.CompanyRateVersion(**row._asdict()) for row in rows]
 
 
 @router.get("/company-rates")
-async def get_company_rates(current_user: models.User = Depends(require_super_admin)):
-    """Get all company rates configuration"""
+async def get_company_rates(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_super_admin)
+):
+    """Get all company rate versions, past and current"""
     return {
-        "rates": get_all_company_rates(),
+        "rates": company_rate_versions(db),
         "default_rate_usd": DEFAULT_RATE_USD,
         "default_rate_egp": DEFAULT_RATE_EGP,
         "currency_support": ["USD", "EGP"],
-        "waste_types": ["نفايات خطرة", "نفايات غير خطرة", "زيوت", "طافلة", "مياه ملوثة", "حمأة", "نفايات صناعية", "مياه ملوثة بالزيت", "نفايات كيميائية", "أخرى"]
-    }
\ No newline at end of file
+        "waste_types": [row[0] for row in db.query(models.WasteType.name).order_by(models.WasteType.id)]
+    }
+
+
+@router.post("/company-rates", response_model=schemas.CompanyRateVersion, status_code=status.HTTP_201_CREATED)
+async def add_company_rate(
+    rate_data: schemas.CompanyRateCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_super_admin)
+):
+    """Add a rate version from effective_from on; the version in effect before it ends the day before"""
+    try:
+        new_rate = add_rate(
+            db,
+            rate_data.company_name,
+            rate_data.waste_type,
+            rate_data.currency,
+            rate_data.rate,
+            rate_data.effective_from,
+            created_by=current_user.id
+        )
+        db.commit()
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    
+    # Re-price cached financial results with the new rate
+    invalidate_rate_index()
+    bump_data_version()
+    
+    return company_rate_versions(db, new_rate.id)[0]
+
+
+@router.get("/exchange-rates", response_model=list[schemas.ExchangeRateEntry])
+async def get_exchange_rates(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_super_admin)
+):
+    """List USD/EGP exchange rates by the day they were set"""
+    return db.query(models.ExchangeRate).order_by(models.ExchangeRate.day).all()
+
+
+@router.post("/exchange-rates", response_model=schemas.ExchangeRateEntry, status_code=status.HTTP_201_CREATED)
+async def add_exchange_rate(
+    rate_data: schemas.ExchangeRateCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_super_admin)
+):
+    """Set the USD/EGP exchange rate from a day on (until the next day with a rate)"""
+    if db.query(models.ExchangeRate.id).filter(models.ExchangeRate.day == rate_data.day).first():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"An exchange rate is already set on {rate_data.day.isoformat()}"
+        )
+    
+    exchange_rate = models.ExchangeRate(
+        day=rate_data.day,
+        egp_per_usd=rate_data.egp_per_usd,
+        created_by=current_user.id
+    )
+    db.add(exchange_rate)
+    db.commit()
+    db.refresh(exchange_rate)
+    
+    # Re-convert cached financial results with the new rate
+    invalidate_exchange_rate_index()
+    bump_data_version()
+    
+    return exchange_rate
+
+
+def closed_financial_periods(db: Session, period_id: Optional[int] = None) -> list:
+    """Closed months (or one of them) with their frozen per-currency totals"""
+    query = db.query(models.ClosedFinancialPeriod)
+    if period_id is not None:
+        query = query.filter(models.ClosedFinancialPeriod.id == period_id)
+    periods = query.order_by(models.ClosedFinancialPeriod.month).all()
+    
+    totals = {}
+    ledger = db.query(
+        models.FinancialLedgerEntry.period_id,
+        models.FinancialLedgerEntry.currency,
+        func.sum(models.FinancialLedgerEntry.total_volume_m3),
+        func.sum(models.FinancialLedgerEntry.total_cost),
+        func.sum(models.FinancialLedgerEntry.reception_count)
+    ).filter(
+        models.FinancialLedgerEntry.period_id.in_([period.id for period in periods])
+    ).group_by(
+        models.FinancialLedgerEntry.period_id,
+        models.FinancialLedgerEntry.currency
+    ).order_by(models.FinancialLedgerEntry.currency)
+    for row_period_id, currency, volume, cost, reception_count in ledger:
+        totals.setdefault(row_period_id, []).append(schemas.CurrencyTotal(
+            currency=currency,
+            total_volume_m3=volume,
+            total_cost=cost,
+            reception_count=reception_count
+        ))
+    
+    return [
+        schemas.ClosedFinancialPeriod(
+            month=period.month.strftime('%Y-%m'),
+            closed_at=period.closed_at,
+            closed_by=period.closed_by,
+            currency_totals=totals.get(period.id, [])
+        )
+        for period in periods
+    ]
+
+
+@router.get("/financial/periods", response_model=list[schemas.ClosedFinancialPeriod])
+async def get_closed_financial_periods(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_super_admin)
+):
+    """List closed financial months"""
+    return closed_financial_periods(db)
+
+
+@router.post("/financial/periods", response_model=schemas.ClosedFinancialPeriod, status_code=status.HTTP_201_CREATED)
+async def close_financial_period(
+    period_data: schemas.FinancialPeriodClose,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_super_admin)
+):
+    """
+    Close a month that has ended: its costs are frozen into the ledger, and
+    its receptions and rates can no longer change.
+    """
+    try:
+        period = close_period(db, datetime.strptime(period_data.month, '%Y-%m').date(), closed_by=current_user.id)
+        db.commit()
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    
+    return closed_financial_periods(db, period.id)[0]
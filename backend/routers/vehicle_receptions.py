@@ -1,43 +1,138 @@
 from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc, and_, or_
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, selectinload, noload
+from sqlalchemy import desc, asc, and_, or_, func, select, DateTime
 import models
 import schemas
-from database import get_db
+from database import get_db, SessionLocal
 from datetime import datetime
 from routers.auth import get_current_user, require_admin_or_above
+import rollups
+import search_index
+import dimensions
+import financials
+from result_cache import summary_cache, bump_data_version
+import base64
+import csv
+import io
+import json
 
 router = APIRouter()
 
 
-@router.get("/", response_model=schemas.VehicleReceptionList)
-async def get_vehicle_receptions(
-    page: int = Query(1, ge=1),
-    size: int = Query(10, ge=1, le=100),
-    sort_by: str = Query("created_at", pattern="^(date|company_name|created_at|total_quantity)$"),
-    sort_order: str = Query("desc", pattern="^(asc|desc)$"),
-    company_filter: Optional[List[str]] = Query(None),
-    water_type_filter: Optional[str] = Query(None),
-    date_from: Optional[str] = Query(None),
-    date_to: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(require_admin_or_above)
+def vehicles_loader(include_vehicles: bool = True):
+    """Loader option for VehicleReception.vehicles: one batched SELECT ... IN for the
+    whole result set instead of a lazy load per reception, or skip loading entirely"""
+    if include_vehicles:
+        return selectinload(models.VehicleReception.vehicles)
+    return noload(models.VehicleReception.vehicles)
+
+
+def get_reception_with_vehicles(db: Session, reception_id: int) -> Optional[models.VehicleReception]:
+    """Load an active reception with its vehicles eagerly loaded"""
+    return db.query(models.VehicleReception).options(vehicles_loader()).filter(
+        models.VehicleReception.id == reception_id,
+        models.VehicleReception.is_active == True
+    ).first()
+
+
+def ensure_period_open(db: Session, *days) -> None:
+    """Reject a reception write dated in a closed financial month"""
+    closed_month = financials.closed_month_among(db, days)
+    if closed_month is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"The financial period {closed_month:%Y-%m} is closed"
+        )
+
+
+def encode_cursor(sort_by: str, sort_order: str, reception: models.VehicleReception) -> str:
+    """Encode the position after `reception` as an opaque keyset cursor"""
+    value = getattr(reception, sort_by)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = {"s": sort_by, "o": sort_order, "v": value, "id": reception.id}
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> tuple:
+    """Decode a keyset cursor into (sort value, id), validating it matches the current sort"""
+    invalid_cursor = HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail="Invalid cursor"
+    )
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw.decode("utf-8"))
+        value, reception_id = payload["v"], int(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise invalid_cursor
+    
+    if payload.get("s") != sort_by or payload.get("o") != sort_order:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Cursor does not match sort_by/sort_order"
+        )
+    
+    sort_column = getattr(models.VehicleReception, sort_by)
+    if isinstance(sort_column.type, DateTime):
+        try:
+            value = datetime.fromisoformat(value)
+        except (ValueError, TypeError):
+            raise invalid_cursor
+    
+    return value, reception_id
+
+
+def apply_keyset(query, sort_by: str, sort_order: str, cursor: Optional[str]):
+    """Order by (sort column, id) and seek past the cursor position instead of using OFFSET"""
+    sort_column = getattr(models.VehicleReception, sort_by)
+    id_column = models.VehicleReception.id
+    direction = desc if sort_order == "desc" else asc
+    query = query.order_by(direction(sort_column), direction(id_column))
+    
+    if not cursor:
+        return query
+    
+    value, reception_id = decode_cursor(cursor, sort_by, sort_order)
+    
+    # Compare against the anchor row's stored value so the predicate uses the
+    # column's own storage format (SQLite keeps server_default timestamps
+    # without microseconds); fall back to the encoded value if the row is gone
+    anchor = func.coalesce(
+        select(sort_column).where(id_column == reception_id).scalar_subquery(),
+        value
+    )
+    if sort_order == "desc":
+        seek = or_(sort_column < anchor, and_(sort_column == anchor, id_column < reception_id))
+    else:
+        seek = or_(sort_column > anchor, and_(sort_column == anchor, id_column > reception_id))
+    
+    return query.filter(seek)
+
+
+def filter_receptions(
+    query,
+    company_filter: Optional[List[str]],
+    water_type_filter: Optional[str],
+    date_from: Optional[str],
+    date_to: Optional[str]
 ):
-    """Get paginated list of vehicle receptions with filtering and sorting"""
-    # Base query
-    query = db.query(models.VehicleReception).filter(models.VehicleReception.is_active == True)
+    """Apply the reception list filters to a query or select (active receptions only)"""
+    query = query.filter(models.VehicleReception.is_active == True)
     
-    # Apply filters
     if company_filter and len(company_filter) > 0:
-        # Handle multiple company filters with OR condition
+        # Handle multiple company filters with OR condition; names are matched
+        # against the (small) company alias table, receptions by integer key
         company_conditions = []
         for company in company_filter:
-            company_conditions.append(models.VehicleReception.company_name.ilike(f"%{company}%"))
+            company_conditions.append(models.VehicleReception.company_id.in_(dimensions.company_ids_matching(company)))
         query = query.filter(or_(*company_conditions))
     
     if water_type_filter:
-        query = query.filter(models.VehicleReception.water_type.ilike(f"%{water_type_filter}%"))
+        query = query.filter(models.VehicleReception.waste_type_id.in_(dimensions.waste_type_ids_matching(water_type_filter)))
     
     if date_from and date_from.strip():
         try:
@@ -59,6 +154,52 @@ async def get_vehicle_receptions(
                 detail="Invalid date_to format. Use YYYY-MM-DD"
             )
     
+    return query
+
+
+@router.get("/", response_model=schemas.VehicleReceptionList)
+async def get_vehicle_receptions(
+    page: int = Query(1, ge=1),
+    size: int = Query(10, ge=1, le=100),
+    sort_by: str = Query("created_at", pattern="^(date|company_name|created_at|total_quantity)$"),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$"),
+    company_filter: Optional[List[str]] = Query(None),
+    water_type_filter: Optional[str] = Query(None),
+    date_from: Optional[str] = Query(None),
+    date_to: Optional[str] = Query(None),
+    pagination: str = Query("offset", pattern="^(offset|cursor)$"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_vehicles: bool = Query(True, description="Set to false to omit the nested vehicles list"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_admin_or_above)
+):
+    """Get paginated list of vehicle receptions with filtering and sorting
+    
+    Offset mode (default) returns page/total/pages. Cursor mode (pagination=cursor
+    or a cursor value) seeks by (sort column, id) so every page costs the same
+    regardless of depth; it skips the total count and returns next_cursor instead.
+    """
+    # Base query
+    query = db.query(models.VehicleReception).options(
+        vehicles_loader(include_vehicles)
+    )
+    
+    # Apply filters
+    query = filter_receptions(query, company_filter, water_type_filter, date_from, date_to)
+    
+    # Keyset pagination
+    if pagination == "cursor" or cursor:
+        query = apply_keyset(query, sort_by, sort_order, cursor)
+        rows = query.limit(size + 1).all()
+        items = rows[:size]
+        next_cursor = encode_cursor(sort_by, sort_order, items[-1]) if len(rows) > size else None
+        
+        return schemas.VehicleReceptionList(
+            items=items,
+            size=size,
+            next_cursor=next_cursor
+        )
+    
     # Apply sorting
     sort_column = getattr(models.VehicleReception, sort_by)
     if sort_order == "desc":
@@ -85,14 +226,176 @@ async def get_vehicle_receptions(
     )
 
 
+# Rows fetched per round trip when exporting
+EXPORT_BATCH_SIZE = 1000
+
+RECEPTION_EXPORT_COLUMNS = (
+    models.VehicleReception.id,
+    models.VehicleReception.reception_number,
+    models.VehicleReception.date,
+    models.VehicleReception.day_of_week,
+    models.VehicleReception.arrival_time,
+    models.VehicleReception.departure_time,
+    models.VehicleReception.company_name,
+    models.VehicleReception.water_type,
+    models.VehicleReception.total_quantity,
+    models.VehicleReception.number_of_vehicles,
+    models.VehicleReception.cutting_boxes_amount,
+    models.VehicleReception.invoice_number,
+    models.VehicleReception.notes,
+    models.VehicleReception.created_at,
+    models.VehicleReception.updated_at,
+)
+
+VEHICLE_EXPORT_COLUMNS = (
+    models.Vehicle.vehicle_order.label("vehicle_order"),
+    models.Vehicle.vehicle_number.label("vehicle_number"),
+    models.Vehicle.vehicle_type.label("vehicle_type"),
+    models.Vehicle.driver_name.label("vehicle_driver_name"),
+    models.Vehicle.car_brand.label("vehicle_car_brand"),
+    models.Vehicle.vehicle_quantity.label("vehicle_quantity"),
+)
+
+
+def export_value(value):
+    """Plain JSON/CSV value for an exported column"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def stream_reception_export(stmt, export_format: str, field_names: list):
+    """
+    Yield an export as CSV or NDJSON in chunks.
+    
+    Rows are read through a server-side cursor EXPORT_BATCH_SIZE at a time and
+    each batch is sent as soon as it is encoded, so memory does not grow with
+    the result size. Uses its own session because it runs after the request
+    handler has returned.
+    """
+    if export_format == "csv":
+        # BOM so Excel opens the Arabic text as UTF-8
+        buffer = io.StringIO()
+        buffer.write("\ufeff")
+        csv.writer(buffer).writerow(field_names)
+        yield buffer.getvalue().encode("utf-8")
+    
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for batch in result.partitions():
+            buffer = io.StringIO()
+            if export_format == "csv":
+                writer = csv.writer(buffer)
+                for row in batch:
+                    writer.writerow(["" if value is None else export_value(value) for value in row])
+            else:
+                for row in batch:
+                    buffer.write(json.dumps(
+                        {field: export_value(value) for field, value in zip(field_names, row)},
+                        ensure_ascii=False
+                    ))
+                    buffer.write("\n")
+            yield buffer.getvalue().encode("utf-8")
+    finally:
+        db.close()
+
+
+@router.get("/export")
+async def export_vehicle_receptions(
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    include_vehicles: bool = Query(False, description="One row per vehicle, with the reception columns repeated"),
+    sort_by: str = Query("date", pattern="^(date|company_name|created_at|total_quantity)$"),
+    sort_order: str = Query("asc", pattern="^(asc|desc)$"),
+    company_filter: Optional[List[str]] = Query(None),
+    water_type_filter: Optional[str] = Query(None),
+    date_from: Optional[str] = Query(None),
+    date_to: Optional[str] = Query(None),
+    current_user: models.User = Depends(require_admin_or_above)
+):
+    """Stream every reception matching the list filters as CSV or NDJSON
+    
+    Takes the same filters as the list endpoint without its page size cap.
+    With include_vehicles, each vehicle becomes a row (receptions without
+    vehicles keep one row with empty vehicle columns).
+    """
+    columns = list(RECEPTION_EXPORT_COLUMNS)
+    if include_vehicles:
+        columns += VEHICLE_EXPORT_COLUMNS
+    
+    stmt = filter_receptions(select(*columns), company_filter, water_type_filter, date_from, date_to)
+    
+    sort_column = getattr(models.VehicleReception, sort_by)
+    direction = desc if sort_order == "desc" else asc
+    stmt = stmt.order_by(direction(sort_column), direction(models.VehicleReception.id))
+    if include_vehicles:
+        stmt = stmt.outerjoin(models.Vehicle, models.Vehicle.reception_id == models.VehicleReception.id)
+        stmt = stmt.order_by(models.Vehicle.vehicle_order, models.Vehicle.id)
+    
+    field_names = [column.key for column in columns]
+    extension, media_type = ("csv", "text/csv") if export_format == "csv" else ("ndjson", "application/x-ndjson")
+    filename = f"vehicle_receptions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+    
+    return StreamingResponse(
+        stream_reception_export(stmt, export_format, field_names),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
+
+
+@router.get("/search", response_model=schemas.VehicleReceptionList)
+async def search_vehicle_receptions(
+    q: str = Query(..., min_length=1, max_length=200, description="Text to find in companies, waste types, notes, invoice/reception numbers, drivers and plates"),
+    page: int = Query(1, ge=1),
+    size: int = Query(20, ge=1, le=100),
+    company_filter: Optional[List[str]] = Query(None),
+    water_type_filter: Optional[str] = Query(None),
+    date_from: Optional[str] = Query(None),
+    date_to: Optional[str] = Query(None),
+    include_vehicles: bool = Query(True, description="Set to false to omit the nested vehicles list"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(require_admin_or_above)
+):
+    """Full-text search of vehicle receptions, best matches first
+    
+    Every word of q must appear (as a substring, case-insensitively) in one of
+    the indexed fields. Looked up in the search index rather than by scanning
+    receptions; the list filters narrow the matches further. The total count
+    is not computed.
+    """
+    if not search_index.search_index_available():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Reception search is not available on this database"
+        )
+    
+    matches = search_index.search_matches(db.get_bind(), q)
+    if matches is None:
+        return schemas.VehicleReceptionList(items=[], page=page, size=size)
+    
+    query = db.query(models.VehicleReception).options(
+        vehicles_loader(include_vehicles)
+    ).join(matches, matches.c.reception_id == models.VehicleReception.id)
+    query = filter_receptions(query, company_filter, water_type_filter, date_from, date_to)
+    
+    items = query.order_by(
+        matches.c.rank, desc(models.VehicleReception.date), desc(models.VehicleReception.id)
+    ).offset((page - 1) * size).limit(size).all()
+    
+    return schemas.VehicleReceptionList(items=items, page=page, size=size)
+
+
 @router.get("/{reception_id}", response_model=schemas.VehicleReception)
 async def get_vehicle_reception(
     reception_id: int, 
+    include_vehicles: bool = Query(True, description="Set to false to omit the nested vehicles list"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(require_admin_or_above)
 ):
     """Get a specific vehicle reception by ID"""
-    reception = db.query(models.VehicleReception).filter(
+    reception = db.query(models.VehicleReception).options(
+        vehicles_loader(include_vehicles)
+    ).filter(
         models.VehicleReception.id == reception_id,
         models.VehicleReception.is_active == True
     ).first()
@@ -114,6 +417,8 @@ async def create_enhanced_vehicle_reception(
 ):
     """Create a new enhanced vehicle reception record with multiple vehicles"""
     
+    ensure_period_open(db, reception_data.date)
+    
     # Generate unique reception number
     import uuid
     reception_number = f"RCP-{datetime.now().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8].upper()}"
@@ -131,7 +436,9 @@ async def create_enhanced_vehicle_reception(
     })
     
     db_reception = models.VehicleReception(**reception_dict)
+    dimensions.assign_dimensions(db, db_reception)
     db.add(db_reception)
+    rollups.record_reception(db, db_reception)
     db.commit()
     db.refresh(db_reception)
     
@@ -143,12 +450,12 @@ async def create_enhanced_vehicle_reception(
         db_vehicle = models.Vehicle(**vehicle_dict)
         db.add(db_vehicle)
     
+    search_index.index_reception(db, db_reception)
     db.commit()
+    bump_data_version()
     
-    # Refresh to get vehicles
-    db.refresh(db_reception)
-    
-    return db_reception
+    # Reload with vehicles batch-loaded for the response
+    return get_reception_with_vehicles(db, db_reception.id)
 
 
 @router.post("/", response_model=schemas.VehicleReception, status_code=status.HTTP_201_CREATED)
@@ -159,18 +466,23 @@ async def create_vehicle_reception(
 ):
     """Create a new vehicle reception record (backward compatibility)"""
     
+    ensure_period_open(db, reception_data.date)
+    
     # Create new reception with auto-generated day_of_week and created_by
     reception_dict = reception_data.dict()
     reception_dict['day_of_week'] = reception_data.date.strftime('%A')  # e.g., 'Monday'
     reception_dict['created_by'] = current_user.id
     
     db_reception = models.VehicleReception(**reception_dict)
+    dimensions.assign_dimensions(db, db_reception)
     
     db.add(db_reception)
+    rollups.record_reception(db, db_reception)
+    search_index.index_reception(db, db_reception)
     db.commit()
-    db.refresh(db_reception)
+    bump_data_version()
     
-    return db_reception
+    return get_reception_with_vehicles(db, db_reception.id)
 
 
 @router.put("/{reception_id}", response_model=schemas.VehicleReception)
@@ -201,6 +513,11 @@ async def update_vehicle_reception(
             detail="You can only edit records you created"
         )
     
+    ensure_period_open(db, db_reception.date, reception_data.date)
+    
+    # Snapshot the rollup contribution before changing anything
+    previous_rollup = rollups.reception_rollup_values(db_reception)
+    
     # Update fields
     update_data = reception_data.dict(exclude_unset=True)
     for field, value in update_data.items():
@@ -210,10 +527,18 @@ async def update_vehicle_reception(
     if 'date' in update_data:
         db_reception.day_of_week = update_data['date'].strftime('%A')
     
+    if 'company_name' in update_data or 'water_type' in update_data:
+        dimensions.assign_dimensions(db, db_reception)
+    
+    # Move the reception's totals to its (possibly new) rollup row
+    rollups.apply_rollup_delta(db, previous_rollup, -1)
+    rollups.record_reception(db, db_reception)
+    search_index.index_reception(db, db_reception)
+    
     db.commit()
-    db.refresh(db_reception)
+    bump_data_version()
     
-    return db_reception
+    return get_reception_with_vehicles(db, db_reception.id)
 
 
 @router.delete("/{reception_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -243,9 +568,47 @@ async def delete_vehicle_reception(
             detail="You can only delete records you created"
         )
     
+    ensure_period_open(db, db_reception.date)
+    
     # Soft delete
+    rollups.unrecord_reception(db, db_reception)
+    search_index.unindex_reception(db, db_reception.id)
     db_reception.is_active = False
     db.commit()
+    bump_data_version()
+
+
+def compute_reception_stats(query) -> dict:
+    """Aggregate a filtered daily rollup query into the stats summary response"""
+    rollup = models.DailyReceptionRollup
+    
+    # Aggregate in the database instead of hydrating every reception
+    total_receptions, total_vehicles, total_quantity = query.with_entities(
+        func.sum(rollup.reception_count),
+        func.sum(rollup.vehicle_count),
+        func.sum(rollup.total_quantity)
+    ).one()
+    
+    if not total_receptions:
+        return {
+            "total_receptions": 0,
+            "total_vehicles": 0,
+            "total_quantity": 0,
+            "companies": [],
+            "water_types": []
+        }
+    
+    # Get unique companies and water types
+    companies = [row[0] for row in query.with_entities(rollup.company_name).distinct()]
+    water_types = [row[0] for row in query.with_entities(rollup.water_type).distinct()]
+    
+    return {
+        "total_receptions": total_receptions,
+        "total_vehicles": total_vehicles,
+        "total_quantity": total_quantity,
+        "companies": companies,
+        "water_types": water_types
+    }
 
 
 @router.get("/stats/summary")
@@ -257,14 +620,16 @@ async def get_reception_stats(
 ):
     """Get summary statistics for vehicle receptions"""
     
-    # Base query
-    query = db.query(models.VehicleReception).filter(models.VehicleReception.is_active == True)
+    # Read from the daily rollup rather than raw receptions
+    rollup = models.DailyReceptionRollup
+    query = db.query(rollup).filter(rollup.reception_count > 0)
+    date_from_dt = date_to_dt = None
     
     # Apply date filters with proper parsing
     if date_from and date_from.strip():
         try:
             date_from_dt = datetime.strptime(date_from.strip(), '%Y-%m-%d').date()
-            query = query.filter(models.VehicleReception.date >= date_from_dt)
+            query = query.filter(rollup.day >= date_from_dt)
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
@@ -274,40 +639,15 @@ async def get_reception_stats(
     if date_to and date_to.strip():
         try:
             date_to_dt = datetime.strptime(date_to.strip(), '%Y-%m-%d').date()
-            query = query.filter(models.VehicleReception.date <= date_to_dt)
+            query = query.filter(rollup.day <= date_to_dt)
         except ValueError:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
                 detail="Invalid date_to format. Use YYYY-MM-DD"
             )
     
-    receptions = query.all()
-    
-    if not receptions:
-        return {
-            "total_receptions": 0,
-            "total_vehicles": 0,
-            "total_quantity": 0,
-            "companies": [],
-            "water_types": []
-        }
-    
-    # Calculate statistics
-    total_receptions = len(receptions)
-    total_vehicles = sum(r.number_of_vehicles for r in receptions)
-    total_quantity = sum(r.total_quantity for r in receptions)
-    
-    # Get unique companies and water types
-    companies = list(set(r.company_name for r in receptions))
-    water_types = list(set(r.water_type for r in receptions))
-    
-    return {
-        "total_receptions": total_receptions,
-        "total_vehicles": total_vehicles,
-        "total_quantity": total_quantity,
-        "companies": companies,
-        "water_types": water_types
-    }
+    cache_key = ("vehicle_receptions.stats", date_from_dt, date_to_dt)
+    return summary_cache.get_or_set(cache_key, lambda: compute_reception_stats(query))
 
 
 @router.get("/vehicles/options", response_model=List[schemas.VehicleOption])
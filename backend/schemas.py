@@ -1,5 +1,5 @@
 from datetime import datetime, date
-from typing import Optional, List
+from typing import Optional, List, Literal, Union
 from pydantic import BaseModel, Field, validator
 
 
@@ -86,6 +86,8 @@ class VehicleReception(VehicleReceptionBase):
     day_of_week: str  # This will be auto-generated from date
     reception_number: Optional[str] = None
     cutting_boxes_amount: Optional[float] = None
+    company_id: Optional[int] = None
+    waste_type_id: Optional[int] = None
     created_at: datetime
     updated_at: datetime
     is_active: bool
@@ -99,10 +101,11 @@ class VehicleReception(VehicleReceptionBase):
 class VehicleReceptionList(BaseModel):
     """Schema for paginated vehicle reception list"""
     items: list[VehicleReception]
-    total: int
-    page: int
+    total: Optional[int] = None  # Not computed in cursor mode
+    page: Optional[int] = None  # Not used in cursor mode
     size: int
-    pages: int
+    pages: Optional[int] = None  # Not computed in cursor mode
+    next_cursor: Optional[str] = None  # Cursor mode only; None on the last page
 
 
 class UserBase(BaseModel):
@@ -156,29 +159,89 @@ class ReportRequest(BaseModel):
     water_type_filter: Optional[str] = None
 
 
+class ReportBatchRequest(BaseModel):
+    """Schema for generating one report per company in a single call"""
+    start_date: str = Field(..., description="Start date in YYYY-MM-DD format")
+    end_date: str = Field(..., description="End date in YYYY-MM-DD format")
+    report_type: str = Field(..., pattern="^(daily|weekly|monthly)$")
+    companies: Union[Literal["all"], List[str]] = Field("all", description='Company names (Arabic, English or any alias), or "all"')
+    water_type_filter: Optional[str] = None
+
+
 class FinancialReportRequest(BaseModel):
     """Schema for financial report generation request"""
     start_date: str = Field(..., description="Start date in YYYY-MM-DD format")
     end_date: str = Field(..., description="End date in YYYY-MM-DD format")
     company_filter: Optional[str] = None
+    convert_to: Optional[Literal["USD", "EGP"]] = None  # Also show a grand total converted to this currency
+
+
+class ReportJobCreate(BaseModel):
+    """Schema for submitting a background report job (exactly one report)"""
+    report: Optional[ReportRequest] = None
+    financial_report: Optional[FinancialReportRequest] = None
+
+    @validator("financial_report", always=True)
+    def exactly_one_report(cls, v, values):
+        if (v is None) == (values.get("report") is None):
+            raise ValueError("Provide exactly one of report or financial_report")
+        return v
+
+
+class ReportJobStatus(BaseModel):
+    """Schema for background report job status"""
+    id: str
+    kind: str
+    status: str
+    stage: str
+    progress: float
+    filename: str
+    error: Optional[str] = None
+    size_bytes: Optional[int] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
 
 
 class CompanyFinancialSummary(BaseModel):
-    """Schema for company financial summary"""
+    """Schema for company financial summary (one line per company, waste type and rate)"""
     company_name: str
+    waste_type: Optional[str] = None
     total_volume_m3: float
     rate_per_m3: float
+    currency: str = "USD"
+    total_cost: float
+    reception_count: int
+
+
+class CurrencyTotal(BaseModel):
+    """Schema for the financial totals in one currency"""
+    currency: str
+    total_volume_m3: float
     total_cost: float
     reception_count: int
 
 
+class ConvertedTotal(BaseModel):
+    """Schema for the financial total of every currency converted into one"""
+    currency: str
+    total_cost: float
+    egp_per_usd: float
+    exchange_rate_day: date  # Day the exchange rate used was set
+
+
 class FinancialReportSummary(BaseModel):
     """Schema for financial report summary"""
     period_start: str
     period_end: str
     companies: list[CompanyFinancialSummary]
+    currency_totals: list[CurrencyTotal] = []
     total_volume_m3: float
-    total_cost: float
+    total_cost: Optional[float] = None  # Only when every line is in the same currency
+    converted_total: Optional[ConvertedTotal] = None
     generated_at: datetime
 
 
@@ -194,6 +257,97 @@ class CompanyRatesResponse(BaseModel):
     default_rate: float
 
 
+class CompanyRateCreate(BaseModel):
+    """Schema for adding a company rate version"""
+    company_name: str = Field(..., max_length=100)
+    waste_type: Optional[str] = Field(None, max_length=50)  # None = all of the company's waste types
+    currency: Literal["USD", "EGP"]
+    rate: float = Field(..., ge=0)
+    effective_from: date
+
+
+class CompanyRateVersion(BaseModel):
+    """Schema for a company rate version"""
+    id: int
+    name: str  # Company name
+    name_en: Optional[str] = None
+    type: Optional[str] = None  # Waste type; None = all of the company's waste types
+    currency: str
+    rate: float
+    effective_from: date
+    effective_to: Optional[date] = None  # Inclusive; None while current
+
+
+class ExchangeRateCreate(BaseModel):
+    """Schema for setting the USD/EGP exchange rate from a day on"""
+    day: date
+    egp_per_usd: float = Field(..., gt=0)
+
+
+class ExchangeRateEntry(BaseModel):
+    """Schema for a USD/EGP exchange rate"""
+    id: int
+    day: date
+    egp_per_usd: float
+    
+    class Config:
+        from_attributes = True
+
+
+class FinancialPeriodClose(BaseModel):
+    """Schema for closing a financial month"""
+    month: str = Field(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$", description="Month in YYYY-MM format")
+
+
+class ClosedFinancialPeriod(BaseModel):
+    """Schema for a closed financial month and its frozen totals"""
+    month: str  # YYYY-MM
+    closed_at: Optional[datetime] = None
+    closed_by: Optional[int] = None
+    currency_totals: list[CurrencyTotal]
+
+
+class ScenarioRate(BaseModel):
+    """Schema for one rate of a what-if rate table"""
+    company_name: str = Field(..., max_length=100)
+    waste_type: Optional[str] = Field(None, max_length=50)  # None = all of the company's waste types
+    currency: Literal["USD", "EGP"]
+    rate: float = Field(..., ge=0)
+
+
+class RateScenario(BaseModel):
+    """Schema for a named what-if rate table"""
+    name: str = Field(..., max_length=100)
+    rates: list[ScenarioRate]
+
+
+class RateSimulationRequest(BaseModel):
+    """Schema for pricing a period under candidate rate tables"""
+    start_date: str = Field(..., description="Start date in YYYY-MM-DD format")
+    end_date: str = Field(..., description="End date in YYYY-MM-DD format")
+    company_filter: Optional[str] = None
+    scenarios: list[RateScenario] = Field(..., min_length=1, max_length=50)
+
+
+class RateSimulationLine(BaseModel):
+    """Schema for one company and waste type priced under every scenario"""
+    company_name: str
+    waste_type: Optional[str] = None
+    total_volume_m3: float
+    reception_count: int
+    costs: list[dict[str, float]]  # Per scenario: currency -> cost
+
+
+class RateSimulationResult(BaseModel):
+    """Schema for a what-if pricing comparison"""
+    period_start: str
+    period_end: str
+    scenarios: list[str]  # Current rates first, then the requested scenarios
+    lines: list[RateSimulationLine]
+    totals: list[dict[str, float]]  # Per scenario: currency -> cost
+    generated_at: datetime
+
+
 # Petrotreatment Vehicles schemas
 class PetrotreatmentVehicleBase(BaseModel):
     """Base schema for Petrotreatment vehicle"""
@@ -0,0 +1,272 @@
+# Reception full-text search index
+# Keeps one search document per active reception (company, waste type, notes,
+# invoice and reception numbers, plus its vehicles' drivers and plates) in a
+# text-indexed table, written in the same transaction as every reception or
+# vehicle change. SQLite uses an FTS5 table with the trigram tokenizer;
+# PostgreSQL uses a tsvector GIN index for ranking and a pg_trgm GIN index so
+# substrings (including Arabic, which has no word stemming here) match
+# without scanning receptions.
+
+import re
+from sqlalchemy import text, Integer, Float
+from sqlalchemy.orm import Session
+import models
+
+SEARCH_TABLE = "reception_search"
+
+# Trigram indexes can only look up terms of at least this many characters
+MIN_INDEXED_TERM = 3
+
+# Receptions indexed per round trip by rebuild_search_index
+REBUILD_BATCH_SIZE = 1000
+
+# Reception columns reception_document reads, for rebuilding without ORM objects
+SEARCH_DOCUMENT_COLUMNS = (
+    models.VehicleReception.id,
+    models.VehicleReception.company_name,
+    models.VehicleReception.water_type,
+    models.VehicleReception.reception_number,
+    models.VehicleReception.invoice_number,
+    models.VehicleReception.notes,
+)
+
+# Whether this process's database has the search table, recorded by
+# ensure_search_index at startup. Without it (SQLite before 3.34 has no
+# trigram tokenizer, PostgreSQL may lack pg_trgm) reception writes skip the
+# index and search reports itself unavailable.
+_index_available = False
+
+
+def _is_postgresql(bind) -> bool:
+    return bind.dialect.name == "postgresql"
+
+
+def create_search_index(connection) -> None:
+    """Create the search table and its indexes if missing (safe to run repeatedly)"""
+    if _is_postgresql(connection):
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+            " reception_id INTEGER PRIMARY KEY REFERENCES vehicle_receptions(id) ON DELETE CASCADE,"
+            " document TEXT NOT NULL,"
+            " document_tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('simple', document)) STORED"
+            ")"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS idx_{SEARCH_TABLE}_tsv ON {SEARCH_TABLE} USING GIN (document_tsv)"
+        ))
+        connection.execute(text(
+            f"CREATE INDEX IF NOT EXISTS idx_{SEARCH_TABLE}_trgm ON {SEARCH_TABLE} USING GIN (document gin_trgm_ops)"
+        ))
+    else:
+        # rowid is the reception id
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(document, tokenize='trigram')"
+        ))
+
+
+def ensure_search_index(engine) -> bool:
+    """
+    Create the search index if missing and record whether it is available.
+
+    Args:
+        engine: Database engine
+
+    Returns:
+        bool: True if the search index can be used
+    """
+    global _index_available
+    try:
+        with engine.begin() as connection:
+            create_search_index(connection)
+        _index_available = True
+    except Exception as e:
+        _index_available = False
+        print(f"❌ Search index unavailable, reception search is disabled: {e}")
+    return _index_available
+
+
+def search_index_available() -> bool:
+    """True if ensure_search_index found or created the search index"""
+    return _index_available
+
+
+def reception_document(reception: models.VehicleReception, vehicles: list) -> str:
+    """
+    Text indexed for a reception.
+
+    Args:
+        reception (VehicleReception): Reception (or row of SEARCH_DOCUMENT_COLUMNS) to index
+        vehicles (list): (driver_name, vehicle_number) pairs of its active vehicles
+
+    Returns:
+        str: One field per line
+    """
+    fields = [
+        reception.company_name,
+        reception.water_type,
+        reception.reception_number,
+        reception.invoice_number,
+        reception.notes,
+    ]
+    for driver_name, vehicle_number in vehicles:
+        fields.extend([driver_name, vehicle_number])
+    return "\n".join(field.strip() for field in fields if field and field.strip())
+
+
+def index_reception(db: Session, reception: models.VehicleReception) -> None:
+    """
+    Write a new or changed reception (and its vehicles) to the search index.
+
+    Flushes pending changes so the reception id and its vehicles are visible,
+    and runs in the caller's transaction so the index commits or rolls back
+    with the write. Inactive receptions are removed instead. Does nothing
+    when the search index is unavailable.
+    """
+    if not _index_available:
+        return
+    db.flush()
+    if reception.is_active is False:
+        unindex_reception(db, reception.id)
+        return
+
+    vehicles = db.query(models.Vehicle.driver_name, models.Vehicle.vehicle_number).filter(
+        models.Vehicle.reception_id == reception.id,
+        models.Vehicle.is_active == True
+    ).order_by(models.Vehicle.vehicle_order, models.Vehicle.id).all()
+    document = reception_document(reception, vehicles)
+
+    if _is_postgresql(db.get_bind()):
+        db.execute(text(
+            f"INSERT INTO {SEARCH_TABLE} (reception_id, document) VALUES (:id, :document) "
+            "ON CONFLICT (reception_id) DO UPDATE SET document = EXCLUDED.document"
+        ), {"id": reception.id, "document": document})
+    else:
+        db.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :id"), {"id": reception.id})
+        db.execute(text(f"INSERT INTO {SEARCH_TABLE} (rowid, document) VALUES (:id, :document)"),
+                   {"id": reception.id, "document": document})
+
+
+def unindex_reception(db: Session, reception_id: int) -> None:
+    """Remove a reception (about to be soft deleted) from the search index, if available"""
+    if not _index_available:
+        return
+    key = "reception_id" if _is_postgresql(db.get_bind()) else "rowid"
+    db.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE {key} = :id"), {"id": reception_id})
+
+
+def search_terms(query: str) -> list:
+    """Split a search query into terms, ignoring empty ones"""
+    return [term for term in re.split(r"\s+", query.strip()) if term]
+
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def search_matches(bind, query: str):
+    """
+    Selectable of (reception_id, rank) for receptions matching every term.
+
+    Terms match as case-insensitive substrings. Lower rank sorts first.
+
+    Args:
+        bind: Engine or connection, for the dialect
+        query (str): Search text
+
+    Returns:
+        Subquery with reception_id and rank columns, or None if query has no terms
+    """
+    terms = search_terms(query)
+    if not terms:
+        return None
+
+    patterns = {f"p{i}": _like_pattern(term) for i, term in enumerate(terms)}
+
+    if _is_postgresql(bind):
+        # The trigram index answers the ILIKEs; the tsvector ranks whole-word hits first
+        params = dict(patterns, q=" ".join(terms))
+        conditions = [f"document ILIKE :{name} ESCAPE '\\'" for name in patterns]
+        sql = (
+            f"SELECT reception_id, -ts_rank(document_tsv, plainto_tsquery('simple', :q)) AS rank "
+            f"FROM {SEARCH_TABLE} WHERE {' AND '.join(conditions)}"
+        )
+    else:
+        # FTS5 trigram MATCH for terms long enough to index; shorter ones
+        # filter the candidates with LIKE
+        params = {}
+        conditions = []
+        indexed = [term for term in terms if len(term) >= MIN_INDEXED_TERM]
+        if indexed:
+            params["match"] = " AND ".join('"' + term.replace('"', '""') + '"' for term in indexed)
+            conditions.append(f"{SEARCH_TABLE} MATCH :match")
+        for i, term in enumerate(terms):
+            if len(term) < MIN_INDEXED_TERM:
+                params[f"p{i}"] = patterns[f"p{i}"]
+                conditions.append(f"document LIKE :p{i} ESCAPE '\\'")
+        rank = "rank" if indexed else "0.0"
+        sql = f"SELECT rowid AS reception_id, {rank} AS rank FROM {SEARCH_TABLE} WHERE {' AND '.join(conditions)}"
+
+    return text(sql).bindparams(**params).columns(reception_id=Integer, rank=Float).subquery("search_matches")
+
+
+def rebuild_search_index(db: Session) -> int:
+    """
+    Recompute the search index from vehicle_receptions and vehicles, for
+    backfill or drift repair.
+
+    Args:
+        db (Session): Database session (committed by this function)
+
+    Returns:
+        int: Number of receptions indexed
+    """
+    try:
+        db.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+        count = 0
+        last_id = 0
+        while True:
+            # Keyset batches on the primary key alone (an is_active filter
+            # steers the planner to an index that needs a sort), so no cursor
+            # stays open while writing
+            batch = db.query(*SEARCH_DOCUMENT_COLUMNS, models.VehicleReception.is_active).filter(
+                models.VehicleReception.id > last_id
+            ).order_by(models.VehicleReception.id).limit(REBUILD_BATCH_SIZE).all()
+            if not batch:
+                break
+            count += _index_batch(db, [row for row in batch if row.is_active is not False])
+            last_id = batch[-1].id
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return count
+
+
+def _index_batch(db: Session, receptions: list) -> int:
+    if not receptions:
+        return 0
+    vehicles = {}
+    for reception_id, driver_name, vehicle_number in db.query(
+        models.Vehicle.reception_id, models.Vehicle.driver_name, models.Vehicle.vehicle_number
+    ).filter(
+        models.Vehicle.reception_id.in_([reception.id for reception in receptions]),
+        models.Vehicle.is_active == True
+    ).order_by(models.Vehicle.vehicle_order, models.Vehicle.id):
+        vehicles.setdefault(reception_id, []).append((driver_name, vehicle_number))
+
+    key = "reception_id" if _is_postgresql(db.get_bind()) else "rowid"
+    db.execute(
+        text(f"INSERT INTO {SEARCH_TABLE} ({key}, document) VALUES (:id, :document)"),
+        [{"id": reception.id, "document": reception_document(reception, vehicles.get(reception.id, []))}
+         for reception in receptions]
+    )
+    return len(receptions)
+
+
+def search_index_empty(db: Session) -> bool:
+    """True if the search index has no rows yet"""
+    key = "reception_id" if _is_postgresql(db.get_bind()) else "rowid"
+    return db.execute(text(f"SELECT {key} FROM {SEARCH_TABLE} LIMIT 1")).first() is None
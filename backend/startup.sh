@@ -26,6 +26,24 @@ python migrate_enhanced_reception.py || {
     echo "⚠️  Migration failed, but continuing startup..."
     echo "💡 This might be normal if schema already exists"
 }
+python migrate_dimensions.py || {
+    echo "⚠️  Dimension migration failed, but continuing startup..."
+}
+python migrate_reception_revision.py || {
+    echo "⚠️  Reception revision migration failed, but continuing startup..."
+}
+python migrate_rates.py || {
+    echo "⚠️  Company rates migration failed, but continuing startup..."
+}
+python migrate_indexes.py || {
+    echo "⚠️  Index migration failed, but continuing startup..."
+}
+python rebuild_rollups.py --if-empty || {
+    echo "⚠️  Rollup backfill failed, but continuing startup..."
+}
+python rebuild_search_index.py --if-empty || {
+    echo "⚠️  Search index backfill failed, but continuing startup..."
+}
 
 # Create admin user if it doesn't exist
 echo "👤 Creating admin user..."
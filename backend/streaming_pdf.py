@@ -0,0 +1,221 @@
+# Streaming PDF canvas
+# ReportLab's canvas keeps every page in memory until save(), and merging the
+# letterhead afterwards needs the whole document again. This canvas writes
+# each page out as soon as it is finished, with the letterhead drawn from one
+# shared Form XObject, so a report of any length is produced in flat memory.
+# It implements the subset of the ReportLab canvas API the report layouts use
+# (setFont, drawString, line, stringWidth, showPage, save) with the standard
+# Helvetica fonts. PdfPageCanvas draws the same way but only collects page
+# content streams, so pages can be rendered in worker processes and then
+# written in order with StreamingPdfCanvas.add_page().
+
+import io
+import zlib
+from typing import Optional
+from PyPDF2 import PdfWriter
+from reportlab.pdfbase.pdfmetrics import getFont, stringWidth, unicode2T1
+
+STANDARD_FONTS = {
+    "Helvetica": "/F1",
+    "Helvetica-Bold": "/F2",
+    # ReportLab's substitution font for characters WinAnsi cannot encode
+    "ZapfDingbats": "/F3",
+}
+
+
+def _num(value: float) -> str:
+    """Compact PDF number"""
+    text = f"{value:.2f}".rstrip("0").rstrip(".")
+    return text if text not in ("", "-0") else "0"
+
+
+def _pdf_string(data: bytes) -> bytes:
+    """Escape encoded text as a PDF literal string"""
+    data = data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+    return b"(" + data + b")"
+
+
+class PdfPageCanvas:
+    """
+    Canvas that records each finished page as a compressed content stream.
+
+    Pages refer to fonts by the resource names in STANDARD_FONTS, which
+    StreamingPdfCanvas provides.
+    """
+
+    def __init__(self, pagesize: tuple):
+        self.width, self.height = pagesize
+        self.pages = []
+        self._ops = []
+        self._font_name = "Helvetica"
+        self._font_size = 12
+
+    def setFont(self, font_name: str, size: float) -> None:
+        if font_name not in STANDARD_FONTS:
+            raise ValueError(f"Unsupported font: {font_name}")
+        self._font_name = font_name
+        self._font_size = size
+
+    def stringWidth(self, text: str, font_name: Optional[str] = None, size: Optional[float] = None) -> float:
+        return stringWidth(text, font_name or self._font_name, size or self._font_size)
+
+    def drawString(self, x: float, y: float, text: str) -> None:
+        # Encode as ReportLab does: WinAnsi, with unencodable characters
+        # switched to its substitution font
+        font = getFont(self._font_name)
+        size = _num(self._font_size)
+        op = [f"BT 1 0 0 1 {_num(x)} {_num(y)} Tm".encode("ascii")]
+        for segment_font, data in unicode2T1(text, [font] + font.substitutionFonts):
+            op.append(f"{STANDARD_FONTS[segment_font.fontName]} {size} Tf ".encode("ascii") + _pdf_string(data) + b" Tj")
+        op.append(b"ET")
+        self._ops.append(b" ".join(op))
+
+    def line(self, x1: float, y1: float, x2: float, y2: float) -> None:
+        self._ops.append(f"{_num(x1)} {_num(y1)} m {_num(x2)} {_num(y2)} l S".encode("ascii"))
+
+    def showPage(self) -> None:
+        """Finish the current page"""
+        self.pages.append(zlib.compress(b"\n".join(self._ops)))
+        self._ops = []
+        # Like ReportLab, each page starts from the default font
+        self._font_name = "Helvetica"
+        self._font_size = 12
+
+    def save(self) -> None:
+        """Finish the last page if anything was drawn on it"""
+        if self._ops:
+            self.showPage()
+
+
+class StreamingPdfCanvas(PdfPageCanvas):
+    """
+    Canvas that emits a PDF incrementally.
+
+    Call take() after each showPage() (and after save()) to collect the bytes
+    written so far; nothing but the page and object offsets is retained.
+    """
+
+    def __init__(self, pagesize: tuple, letterhead=None, letterhead_name: str = "/Letterhead"):
+        """
+        Args:
+            pagesize (tuple): Page width and height in points
+            letterhead: Optional template exposing add_to(writer) -> form reference,
+                drawn underneath every page
+            letterhead_name (str): Resource name for the letterhead form
+        """
+        super().__init__(pagesize)
+        self._pending = []
+        self._position = 0
+        self._offsets = {}  # object number -> byte offset
+        self._next_id = 1
+        self._page_ids = []
+        self._letterhead_draw_id = None
+        self._saved = False
+
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+        xobjects = ""
+        if letterhead is not None:
+            # Serialise the letterhead form and its fonts/images under the
+            # object numbers a scratch writer assigned them
+            scratch = PdfWriter()
+            form_ref = letterhead.add_to(scratch)
+            for idnum, obj in enumerate(scratch._objects, start=1):
+                if obj is not None:
+                    buffer = io.BytesIO()
+                    obj.write_to_stream(buffer, None)
+                    self._write_object(idnum, buffer.getvalue())
+            self._next_id = len(scratch._objects) + 1
+            xobjects = f" /XObject << {letterhead_name} {form_ref.idnum} 0 R >>"
+
+            # One shared stream draws the letterhead underneath each page
+            draw = f"q {letterhead_name} Do Q".encode("ascii")
+            self._letterhead_draw_id = self._new_object(
+                f"<< /Length {len(draw)} >>\nstream\n".encode("ascii") + draw + b"\nendstream"
+            )
+
+        fonts = []
+        for font_name, resource_name in STANDARD_FONTS.items():
+            encoding = "" if font_name == "ZapfDingbats" else " /Encoding /WinAnsiEncoding"
+            font_id = self._new_object(
+                f"<< /Type /Font /Subtype /Type1 /BaseFont /{font_name}{encoding} >>".encode("ascii")
+            )
+            fonts.append(f"{resource_name} {font_id} 0 R")
+        self._resources_id = self._new_object(
+            f"<< /ProcSet [/PDF /Text] /Font << {' '.join(fonts)} >>{xobjects} >>".encode("ascii")
+        )
+        self._pages_id = self._reserve()
+
+    # Low-level output
+
+    def _write(self, data: bytes) -> None:
+        self._pending.append(data)
+        self._position += len(data)
+
+    def _reserve(self) -> int:
+        idnum = self._next_id
+        self._next_id += 1
+        return idnum
+
+    def _write_object(self, idnum: int, body: bytes) -> None:
+        self._offsets[idnum] = self._position
+        self._write(f"{idnum} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
+
+    def _new_object(self, body: bytes) -> int:
+        idnum = self._reserve()
+        self._write_object(idnum, body)
+        return idnum
+
+    def take(self) -> bytes:
+        """Return and forget the bytes written since the last call"""
+        data = b"".join(self._pending)
+        self._pending = []
+        return data
+
+    # Pages
+
+    def add_page(self, content: bytes) -> None:
+        """Write a page from a compressed content stream (e.g. from PdfPageCanvas.pages)"""
+        content_id = self._new_object(
+            f"<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n".encode("ascii") + content + b"\nendstream"
+        )
+        if self._letterhead_draw_id is not None:
+            contents = f"[{self._letterhead_draw_id} 0 R {content_id} 0 R]"
+        else:
+            contents = f"{content_id} 0 R"
+        page_id = self._new_object(
+            f"<< /Type /Page /Parent {self._pages_id} 0 R /MediaBox [0 0 {_num(self.width)} {_num(self.height)}] "
+            f"/Resources {self._resources_id} 0 R /Contents {contents} >>".encode("ascii")
+        )
+        self._page_ids.append(page_id)
+
+    def showPage(self) -> None:
+        """Finish the current page and write it out"""
+        super().showPage()
+        self.add_page(self.pages.pop())
+
+    def save(self) -> None:
+        """Finish the last page and write the page tree, xref table and trailer"""
+        if self._saved:
+            return
+        if self._ops or not self._page_ids:
+            self.showPage()
+
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._page_ids)
+        self._write_object(
+            self._pages_id,
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_ids)} >>".encode("ascii")
+        )
+        catalog_id = self._new_object(f"<< /Type /Catalog /Pages {self._pages_id} 0 R >>".encode("ascii"))
+
+        xref_position = self._position
+        size = self._next_id
+        xref = [f"xref\n0 {size}\n0000000000 65535 f \n"]
+        for idnum in range(1, size):
+            offset = self._offsets.get(idnum)
+            xref.append(f"{offset:010d} 00000 n \n" if offset is not None else "0000000000 65535 f \n")
+        self._write("".join(xref).encode("ascii"))
+        self._write(
+            f"trailer\n<< /Size {size} /Root {catalog_id} 0 R >>\nstartxref\n{xref_position}\n%%EOF\n".encode("ascii")
+        )
+        self._saved = True
@@ -0,0 +1,188 @@
+# Streaming XLSX writer
+# Writes a single-sheet workbook straight into a streamed ZIP: the worksheet
+# entry is written row by row and drained with take(), so memory does not
+# grow with the number of rows. Strings go through the shared strings table,
+# which only holds distinct values (company names, waste types, labels) and
+# is written as the last entry once the sheet is complete.
+
+import zipfile
+from datetime import date, datetime, time
+from typing import Optional
+from xml.sax.saxutils import escape
+from zip_stream import ZipStreamBuffer
+
+EXCEL_EPOCH = datetime(1899, 12, 30)
+
+# Cell styles (indexes into cellXfs below)
+STYLE_DEFAULT = 0
+STYLE_BOLD = 1
+STYLE_DATE = 2
+STYLE_TIME = 3
+STYLE_NUMBER = 4
+STYLE_BOLD_NUMBER = 5
+
+STYLES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<numFmts count="3">
+<numFmt numFmtId="164" formatCode="yyyy-mm-dd"/>
+<numFmt numFmtId="165" formatCode="hh:mm"/>
+<numFmt numFmtId="166" formatCode="#,##0.00"/>
+</numFmts>
+<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="6">
+<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>
+<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/>
+<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="166" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>
+<xf numFmtId="166" fontId="1" fillId="0" borderId="0" xfId="0" applyNumberFormat="1" applyFont="1"/>
+</cellXfs>
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>
+</styleSheet>
+"""
+
+CONTENT_TYPES_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>
+</Types>
+"""
+
+ROOT_RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>
+"""
+
+WORKBOOK_RELS_XML = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Target="sharedStrings.xml"/>
+</Relationships>
+"""
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def column_letter(index: int) -> str:
+    """Spreadsheet column letter for a zero-based column index"""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+class XlsxStreamWriter:
+    """
+    Single-sheet XLSX writer with constant memory per row.
+
+    Call write_row() for each row and take() to collect the bytes produced
+    so far; close() finishes the sheet and writes the shared strings.
+    """
+
+    def __init__(self, sheet_name: str, column_widths: Optional[list] = None):
+        self._buffer = ZipStreamBuffer()
+        self._archive = zipfile.ZipFile(self._buffer, "w", compression=zipfile.ZIP_DEFLATED)
+        self._strings = {}  # distinct string -> shared string index
+        self._string_refs = 0
+        self._row_number = 0
+
+        sheet_name = escape(sheet_name[:31], {'"': "&quot;"})
+        self._archive.writestr("[Content_Types].xml", CONTENT_TYPES_XML)
+        self._archive.writestr("_rels/.rels", ROOT_RELS_XML)
+        self._archive.writestr(
+            "xl/workbook.xml",
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{sheet_name}" sheetId="1" r:id="rId1"/></sheets></workbook>'
+        )
+        self._archive.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS_XML)
+        self._archive.writestr("xl/styles.xml", STYLES_XML)
+
+        self._sheet = self._archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True)
+        self._sheet.write(
+            b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        )
+        if column_widths:
+            cols = "".join(
+                f'<col min="{i}" max="{i}" width="{width}" customWidth="1"/>'
+                for i, width in enumerate(column_widths, start=1)
+            )
+            self._sheet.write(f"<cols>{cols}</cols>".encode("utf-8"))
+        self._sheet.write(b"<sheetData>")
+
+    def _shared_string(self, value: str) -> int:
+        self._string_refs += 1
+        index = self._strings.get(value)
+        if index is None:
+            index = len(self._strings)
+            self._strings[value] = index
+        return index
+
+    def write_row(self, values: list, styles: Optional[list] = None) -> None:
+        """
+        Append a row.
+
+        Args:
+            values (list): Cell values (str, int, float, date, datetime, time or None)
+            styles (list): Optional STYLE_* per cell; dates and times get their
+                format automatically
+        """
+        self._row_number += 1
+        row = self._row_number
+        cells = []
+        for i, value in enumerate(values):
+            if value is None or value == "":
+                continue
+            ref = f"{column_letter(i)}{row}"
+            style = styles[i] if styles else STYLE_DEFAULT
+            if isinstance(value, bool):
+                value = int(value)
+            if isinstance(value, datetime):
+                serial = (value - EXCEL_EPOCH).total_seconds() / 86400
+                cells.append(f'<c r="{ref}" s="{style or STYLE_DATE}"><v>{serial!r}</v></c>')
+            elif isinstance(value, date):
+                serial = (value - EXCEL_EPOCH.date()).days
+                cells.append(f'<c r="{ref}" s="{style or STYLE_DATE}"><v>{serial}</v></c>')
+            elif isinstance(value, time):
+                serial = (value.hour * 3600 + value.minute * 60 + value.second) / 86400
+                cells.append(f'<c r="{ref}" s="{style or STYLE_TIME}"><v>{serial!r}</v></c>')
+            elif isinstance(value, (int, float)):
+                cells.append(f'<c r="{ref}" s="{style}"><v>{value!r}</v></c>')
+            else:
+                index = self._shared_string(str(value))
+                cells.append(f'<c r="{ref}" s="{style}" t="s"><v>{index}</v></c>')
+        self._sheet.write(f'<row r="{row}">{"".join(cells)}</row>'.encode("utf-8"))
+
+    def take(self) -> bytes:
+        """Return and forget the bytes written since the last call"""
+        return self._buffer.take()
+
+    def close(self) -> None:
+        """Finish the sheet and write the shared strings table and ZIP directory"""
+        self._sheet.write(b"</sheetData></worksheet>")
+        self._sheet.close()
+
+        with self._archive.open("xl/sharedStrings.xml", "w") as shared:
+            shared.write(
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                f'count="{self._string_refs}" uniqueCount="{len(self._strings)}">'.encode("utf-8")
+            )
+            for value in self._strings:
+                shared.write(f'<si><t xml:space="preserve">{escape(value)}</t></si>'.encode("utf-8"))
+            shared.write(b"</sst>")
+
+        self._archive.close()
@@ -0,0 +1,24 @@
+# Streaming ZIP output
+# zipfile can write to an unseekable stream (sizes go in data descriptors
+# after each entry), so an archive can be sent while it is being built. The
+# buffer below collects what zipfile writes until the response takes it.
+
+
+class ZipStreamBuffer:
+    """Write-only file object for zipfile.ZipFile whose output is drained with take()"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        """Return and forget the bytes written since the last call"""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
@@ -13,6 +13,10 @@ import { ReportRequest, FinancialReportRequest } from '../types';
 import apiService from '../services/api';
 import { useAuth } from '../hooks/useAuth';
 
+// Costs are shown in their own currency; USD and EGP are never added together
+const formatCost = (amount: number, currency: string) =>
+  currency === 'USD' ? `$${amount.toFixed(2)}` : `${amount.toFixed(2)} ${currency}`;
+
 const ReportsPage: React.FC = () => {
   const { t, i18n } = useTranslation();
   const { user } = useAuth();
@@ -433,14 +437,14 @@ const ReportsPage: React.FC = () => {
                       {(summary?.totals?.quantity || (isSuperAdmin && financialSummary?.total_volume_m3) || 0).toFixed(2)} m³
                     </span>
                   </div>
-                  {isSuperAdmin && financialSummary && (
-                    <div className="flex justify-between border-t pt-3">
-                      <span className="text-sm text-gray-500">{t('reports.totalCost')}:</span>
+                  {isSuperAdmin && financialSummary && financialSummary.currency_totals.map((total) => (
+                    <div key={total.currency} className="flex justify-between border-t pt-3">
+                      <span className="text-sm text-gray-500">{t('reports.totalCost')} ({total.currency}):</span>
                       <span className="text-sm font-medium text-green-600">
-                        ${financialSummary.total_cost.toFixed(2)}
+                        {formatCost(total.total_cost, total.currency)}
                       </span>
                     </div>
-                  )}
+                  ))}
                 </div>
               </div>
 
@@ -479,10 +483,12 @@ const ReportsPage: React.FC = () => {
                       // Show financial breakdown
                       financialSummary.companies.slice(0, 5).map((company, index) => (
                         <div key={index} className="border-l-4 border-green-400 pl-3">
-                          <div className="text-sm font-medium text-gray-900">{company.company_name}</div>
+                          <div className="text-sm font-medium text-gray-900">
+                            {company.company_name}{company.waste_type ? ` • ${company.waste_type}` : ''}
+                          </div>
                           <div className="text-xs text-gray-500">
                             {company.reception_count} {t('reports.receptions')} • {company.total_volume_m3.toFixed(1)} m³ • 
-                            <span className="text-green-600 font-medium"> ${company.total_cost.toFixed(2)}</span>
+                            <span className="text-green-600 font-medium"> {formatCost(company.total_cost, company.currency)}</span>
                           </div>
                         </div>
                       ))
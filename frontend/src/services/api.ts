@@ -71,6 +71,8 @@ class ApiService {
       size: pagination.size,
       sort_by: filters.sort_by || 'created_at',
       sort_order: filters.sort_order || 'desc',
+      // The reception table only shows number_of_vehicles
+      include_vehicles: false,
     };
     
     // Only add filter parameters if they have valid values
@@ -187,22 +187,41 @@ export interface FinancialReportRequest {
   start_date: string;
   end_date: string;
   company_filter?: string;
+  convert_to?: 'USD' | 'EGP';
 }
 
 export interface CompanyFinancialSummary {
   company_name: string;
+  waste_type?: string;
   total_volume_m3: number;
   rate_per_m3: number;
+  currency: string;
   total_cost: number;
   reception_count: number;
 }
 
+export interface CurrencyTotal {
+  currency: string;
+  total_volume_m3: number;
+  total_cost: number;
+  reception_count: number;
+}
+
+export interface ConvertedTotal {
+  currency: string;
+  total_cost: number;
+  egp_per_usd: number;
+  exchange_rate_day: string;
+}
+
 export interface FinancialReportSummary {
   period_start: string;
   period_end: string;
   companies: CompanyFinancialSummary[];
+  currency_totals: CurrencyTotal[];
   total_volume_m3: number;
-  total_cost: number;
+  total_cost?: number | null;
+  converted_total?: ConvertedTotal | null;
   generated_at: string;
 }
 
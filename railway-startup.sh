@@ -24,6 +24,30 @@ except Exception as e:
     print('Will retry on first API call...')
 "
 
+# Add the company / waste type dimension keys and backfill them (idempotent)
+echo "🏷️ Ensuring company and waste type dimensions..."
+python migrate_dimensions.py || echo "⚠️ Dimension migration failed, continuing startup..."
+
+# Add the reception revision counter used by cached report stamps (idempotent)
+echo "🔢 Ensuring reception revision counter..."
+python migrate_reception_revision.py || echo "⚠️ Reception revision migration failed, continuing startup..."
+
+# Move the company rates into the database on first start
+echo "💱 Ensuring company rates..."
+python migrate_rates.py || echo "⚠️ Company rates migration failed, continuing startup..."
+
+# Add any missing performance indexes (idempotent)
+echo "📇 Ensuring database indexes..."
+python migrate_indexes.py || echo "⚠️ Index migration failed, continuing startup..."
+
+# Backfill the daily reception rollups on first start
+echo "📈 Ensuring daily reception rollups..."
+python rebuild_rollups.py --if-empty || echo "⚠️ Rollup backfill failed, continuing startup..."
+
+# Backfill the reception search index on first start
+echo "🔎 Ensuring reception search index..."
+python rebuild_search_index.py --if-empty || echo "⚠️ Search index backfill failed, continuing startup..."
+
 # Create admin users
 echo "👤 Creating admin users..."
 python -c "